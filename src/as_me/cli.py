@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+from typing import TextIO
+
 import click
 
 from . import __version__
@@ -154,6 +156,50 @@ def memories_show(memory_id: str):
     click.echo(output)
 
 
+@memories.command("add")
+@click.option("--file", "-f", "input_file", type=click.File("r", encoding="utf-8"), default="-",
+              help="记忆 JSON 数组文件，默认从标准输入读取")
+def memories_add(input_file: TextIO) -> None:
+    """批量添加记忆（供 as-me-analyze skill 调用）
+
+    输入为记忆对象的 JSON 数组，id、tier、时间戳等字段可省略。
+    内容与已有记忆相同（忽略大小写）的条目会被跳过。
+    """
+    import json
+    import sys
+    from .memory.models import MemoryAtom
+    from .memory.store import MemoryStore, QueryOptions
+    from .formatters.memory_formatter import format_memory_brief
+
+    try:
+        data = json.load(input_file)
+        if not isinstance(data, list):
+            raise ValueError("输入必须是 JSON 数组")
+        new_memories = [MemoryAtom.model_validate(item) for item in data]
+    except ValueError as e:
+        click.echo(f"错误: 无效的记忆数据: {e}", err=True)
+        return
+
+    store = MemoryStore()
+
+    # 与已有记忆及本批次内的记忆去重
+    existing_contents = {m.content.lower() for m in store.get_all(QueryOptions(limit=sys.maxsize))}
+    to_save = []
+    for memory in new_memories:
+        key = memory.content.lower()
+        if key not in existing_contents:
+            existing_contents.add(key)
+            to_save.append(memory)
+
+    # 通过 MemoryStore 一次写入，与触发增量日志保持一致
+    if to_save:
+        store.save_batch(to_save)
+
+    click.echo(f"已保存 {len(to_save)} 条新记忆，跳过 {len(new_memories) - len(to_save)} 条重复")
+    for memory in to_save:
+        click.echo(format_memory_brief(memory))
+
+
 @memories.command("delete")
 @click.argument("memory_id")
 @click.confirmation_option(prompt="确认删除此记忆?")
@@ -20,6 +20,13 @@ from ..storage.base import get_storage_path
 from ..storage.json_store import read_json_gz, write_json_gz
 
 
+# 所有规则都以"我"或"作为"开头，不含这些字的消息不可能命中任何规则
+_FEATURE_HINT = re.compile(r"我|作为")
+
+# 最短可命中的文本长度（如 "我是XX"）
+MIN_FEATURE_TEXT_LENGTH = 4
+
+
 @dataclass
 class ExtractionResult:
     """提取结果"""
@@ -187,10 +194,17 @@ class SessionExtractor:
         使用简单的规则匹配提取明显的用户特征。
         复杂分析交给 Claude（通过 skill）处理。
         """
-        memories = []
+        memories: List[MemoryAtom] = []
+
+        # 快速排除：文本过短或没有任何规则的引导词时无需合并和匹配
+        if sum(len(m) for m in messages) < MIN_FEATURE_TEXT_LENGTH:
+            return memories
+        if not any(_FEATURE_HINT.search(m) for m in messages):
+            return memories
 
         # 合并所有消息
         full_text = "\n".join(messages)
+        now = datetime.now()
 
         # 规则 1: 明确的身份表达
         identity_patterns = [
@@ -202,14 +216,12 @@ class SessionExtractor:
         for pattern, confidence in identity_patterns:
             matches = re.findall(pattern, full_text)
             for match in matches[:2]:  # 每个模式最多 2 条
-                memories.append(MemoryAtom(
-                    id=str(uuid.uuid4()),
-                    type=MemoryType.IDENTITY,
-                    content=f"用户自述: {match.strip()}",
-                    confidence=confidence,
-                    tier=MemoryTier.SHORT_TERM,
-                    source_session_id=session_id,
-                    tags=["auto_extracted", "rule_based"],
+                memories.append(self._build_memory(
+                    MemoryType.IDENTITY,
+                    f"用户自述: {match.strip()}",
+                    confidence,
+                    session_id,
+                    now,
                 ))
 
         # 规则 2: 偏好表达
@@ -221,14 +233,12 @@ class SessionExtractor:
         for pattern, confidence in preference_patterns:
             matches = re.findall(pattern, full_text)
             for match in matches[:2]:
-                memories.append(MemoryAtom(
-                    id=str(uuid.uuid4()),
-                    type=MemoryType.PREFERENCE,
-                    content=match.strip(),
-                    confidence=confidence,
-                    tier=MemoryTier.SHORT_TERM,
-                    source_session_id=session_id,
-                    tags=["auto_extracted", "rule_based"],
+                memories.append(self._build_memory(
+                    MemoryType.PREFERENCE,
+                    match.strip(),
+                    confidence,
+                    session_id,
+                    now,
                 ))
 
         # 规则 3: 价值/信念表达
@@ -240,18 +250,43 @@ class SessionExtractor:
         for pattern, confidence in value_patterns:
             matches = re.findall(pattern, full_text)
             for match in matches[:2]:
-                memories.append(MemoryAtom(
-                    id=str(uuid.uuid4()),
-                    type=MemoryType.VALUE,
-                    content=match.strip(),
-                    confidence=confidence,
-                    tier=MemoryTier.SHORT_TERM,
-                    source_session_id=session_id,
-                    tags=["auto_extracted", "rule_based"],
+                memories.append(self._build_memory(
+                    MemoryType.VALUE,
+                    match.strip(),
+                    confidence,
+                    session_id,
+                    now,
                 ))
 
         return memories
 
+    def _build_memory(
+        self,
+        memory_type: MemoryType,
+        content: str,
+        confidence: float,
+        session_id: str,
+        now: datetime,
+    ) -> MemoryAtom:
+        """构建规则提取的记忆原子
+
+        规则的置信度为常量、匹配内容长度受正则限制，字段均已知合法，
+        因此使用 model_construct 跳过 Pydantic 校验。
+        """
+        return MemoryAtom.model_construct(
+            id=str(uuid.uuid4()),
+            type=memory_type,
+            content=content[:500],
+            confidence=confidence,
+            tier=MemoryTier.SHORT_TERM,
+            created_at=now,
+            last_triggered_at=now,
+            trigger_count=0,
+            source_session_id=session_id,
+            related_principle_id=None,
+            tags=["auto_extracted", "rule_based"],
+        )
+
     def _save_with_dedup(self, memories: List[MemoryAtom]) -> tuple[List[MemoryAtom], int]:
         """保存记忆并去重
 
@@ -10,10 +10,11 @@ from ..memory.models import MemoryAtom, MemoryTier, MemoryType
 
 # 类型显示名称
 TYPE_NAMES = {
-    MemoryType.TECH_PREFERENCE: "技术偏好",
-    MemoryType.THINKING_PATTERN: "思维模式",
-    MemoryType.BEHAVIOR_HABIT: "行为习惯",
-    MemoryType.LANGUAGE_STYLE: "语言风格",
+    MemoryType.IDENTITY: "身份背景",
+    MemoryType.VALUE: "价值信念",
+    MemoryType.THINKING: "思维认知",
+    MemoryType.PREFERENCE: "偏好习惯",
+    MemoryType.COMMUNICATION: "沟通表达",
 }
 
 # 层级显示名称
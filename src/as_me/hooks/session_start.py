@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
@@ -184,9 +185,10 @@ class SessionStartHook:
             store: 记忆存储
             memories: 被触发的记忆列表 (ScoredMemory 对象)
         """
+        now = datetime.now()
         for scored_memory in memories:
             # ScoredMemory 包装了实际的 MemoryAtom
-            store.trigger(scored_memory.memory.id)
+            store.trigger(scored_memory.memory.id, now)
 
     def _archive_cold_data(self) -> None:
         """归档冷数据
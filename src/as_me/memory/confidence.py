@@ -7,11 +7,16 @@ from __future__ import annotations
 
 import math
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from .models import MemoryAtom
 
 
+# 衰减系数查找表覆盖的天数（约 10 年），超出范围时直接计算
+DECAY_TABLE_DAYS = 3650
+
+
 def calculate_confidence(
     base_confidence: float,
     matching_evidence_count: int,
@@ -46,18 +51,41 @@ def calculate_confidence(
     return base_confidence * consistency_factor * recency_factor
 
 
-def apply_time_decay(memory: MemoryAtom, half_life_days: int = 30) -> float:
+@lru_cache(maxsize=4)
+def decay_table(half_life_days: int) -> Tuple[float, ...]:
+    """按整数天数预计算的衰减系数表
+
+    下标为距上次触发的天数，覆盖 [0, DECAY_TABLE_DAYS)。
+    """
+    return tuple(
+        math.exp(-0.693 * days / half_life_days)
+        for days in range(DECAY_TABLE_DAYS)
+    )
+
+
+def apply_time_decay(
+    memory: MemoryAtom,
+    half_life_days: int = 30,
+    now: Optional[datetime] = None,
+) -> float:
     """应用时间衰减
 
     Args:
         memory: 记忆原子
         half_life_days: 半衰期天数
+        now: 当前时间，批量计算时由调用方传入同一时间，默认 datetime.now()
 
     Returns:
         衰减后的置信度
     """
-    days_since_trigger = (datetime.now() - memory.last_triggered_at).days
-    decay_factor = math.exp(-0.693 * days_since_trigger / half_life_days)
+    if now is None:
+        now = datetime.now()
+
+    days_since_trigger = (now - memory.last_triggered_at).days
+    if 0 <= days_since_trigger < DECAY_TABLE_DAYS:
+        decay_factor = decay_table(half_life_days)[days_since_trigger]
+    else:
+        decay_factor = math.exp(-0.693 * days_since_trigger / half_life_days)
     return memory.confidence * decay_factor
 
 
@@ -90,7 +118,11 @@ def calculate_strengthening(
     return new_confidence
 
 
-def should_delete_memory(memory: MemoryAtom, half_life_days: int = 30) -> bool:
+def should_delete_memory(
+    memory: MemoryAtom,
+    half_life_days: int = 30,
+    now: Optional[datetime] = None,
+) -> bool:
     """判断记忆是否应该被删除
 
     基于记忆层级的删除阈值：
@@ -101,6 +133,7 @@ def should_delete_memory(memory: MemoryAtom, half_life_days: int = 30) -> bool:
     Args:
         memory: 记忆原子
         half_life_days: 半衰期天数
+        now: 当前时间，默认 datetime.now()
 
     Returns:
         是否应该删除
@@ -108,7 +141,7 @@ def should_delete_memory(memory: MemoryAtom, half_life_days: int = 30) -> bool:
     from .models import MemoryTier
 
     # 计算衰减后的置信度
-    decayed_confidence = apply_time_decay(memory, half_life_days)
+    decayed_confidence = apply_time_decay(memory, half_life_days, now)
 
     # 各层级的删除阈值
     thresholds = {
@@ -126,6 +126,10 @@ class MemoryDecay:
         Returns:
             (保留的记忆列表, 应删除的记忆列表)
         """
+        # 整批使用同一参考时间
+        if reference_time is None:
+            reference_time = datetime.now()
+
         to_keep = []
         to_remove = []
 
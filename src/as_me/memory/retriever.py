@@ -5,16 +5,65 @@
 
 from __future__ import annotations
 
+import heapq
+import re
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
-from .confidence import apply_time_decay
+from .confidence import DECAY_TABLE_DAYS, apply_time_decay, decay_table
 from .models import MemoryAtom, MemoryTier, MemoryType
 from .store import MemoryStore, QueryOptions
 
 
-@dataclass
+# 关键词切分：连续汉字为一段，其余按单词切分
+_TOKEN_PATTERN = re.compile(r"[\u4e00-\u9fff]+|[^\W\u4e00-\u9fff]+")
+
+
+# 关键词位图宽度（每个关键词置 2 位）
+_TOKEN_BITS = 128
+
+
+def _tokenize(text: str) -> FrozenSet[str]:
+    """将文本切分为小写关键词集合
+
+    中文没有空格分词，连续汉字按相邻两字（bigram）切分，
+    使“喜欢简洁”与“我喜欢简洁的代码”这类文本能在集合中命中。
+    """
+    tokens: Set[str] = set()
+    for segment in _TOKEN_PATTERN.findall(text.lower()):
+        if len(segment) > 1 and "\u4e00" <= segment[0] <= "\u9fff":
+            tokens.update(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            tokens.add(segment)
+    return frozenset(tokens)
+
+
+def _token_bitmap(tokens: FrozenSet[str]) -> int:
+    """计算关键词集合的布隆位图
+
+    两个位图按位与为 0 时，两个集合一定没有交集。
+    """
+    bits = 0
+    for token in tokens:
+        h = hash(token)
+        bits |= (1 << (h % _TOKEN_BITS)) | (1 << ((h >> 7) % _TOKEN_BITS))
+    return bits
+
+
+# 置信度指示符，下标为 int(confidence * 5)，1.0 落在最后一档
+_CONFIDENCE_INDICATORS = (
+    "",
+    "",
+    "(较低置信度)",
+    "(中等置信度)",
+    "(高置信度)",
+    "(高置信度)",
+)
+
+
+@dataclass(slots=True)
 class ScoredMemory:
     """带评分的记忆"""
     memory: MemoryAtom
@@ -43,6 +92,18 @@ class MemoryRetriever:
         MemoryType.COMMUNICATION: 0.7,  # 沟通表达
     }
 
+    # 类型显示名称（按注入顺序排列）
+    TYPE_NAMES = {
+        MemoryType.IDENTITY: "身份背景",
+        MemoryType.VALUE: "价值信念",
+        MemoryType.THINKING: "思维认知",
+        MemoryType.PREFERENCE: "偏好习惯",
+        MemoryType.COMMUNICATION: "沟通表达",
+    }
+
+    # 关键词缓存条目上限
+    TOKEN_CACHE_SIZE = 1024
+
     def __init__(self, store: MemoryStore, half_life_days: int = 30):
         """初始化检索器
 
@@ -53,6 +114,20 @@ class MemoryRetriever:
         self.store = store
         self.half_life_days = half_life_days
 
+        # 层级权重 × 类型权重的组合表: tier -> type -> weight
+        # 评分循环中两次带默认值的查找和一次乘法合并为一次嵌套下标
+        self._weight_table: Dict[MemoryTier, Dict[MemoryType, float]] = {
+            tier: {
+                mem_type: self.TIER_WEIGHTS.get(tier, 0.5) * self.TYPE_WEIGHTS.get(mem_type, 0.5)
+                for mem_type in MemoryType
+            }
+            for tier in MemoryTier
+        }
+
+        # 记忆关键词缓存: memory_id -> (content, tags, 关键词集合, 布隆位图)
+        # content/tags 用于校验缓存是否过期，超过 TOKEN_CACHE_SIZE 时只保留本次候选
+        self._token_cache: Dict[str, Tuple[str, List[str], FrozenSet[str], int]] = {}
+
     def retrieve_relevant(
         self,
         limit: int = 10,
@@ -75,20 +150,25 @@ class MemoryRetriever:
             limit=limit * 3,  # 多取一些用于排序
         ))
 
-        # 计算相关性评分
-        scored = []
-        for memory in memories:
-            score = self._calculate_relevance(memory, context)
-            if score > 0:
-                scored.append(ScoredMemory(memory=memory, relevance_score=score))
+        # 上下文只切分一次，当前时间只取一次
+        context_tokens = _tokenize(context) if context else None
+        now = datetime.now()
+
+        # 计算相关性评分（只对候选记忆切分关键词）
+        scores = self._calculate_relevance_batch(memories, context_tokens, now)
+        self._prune_token_cache(memories)
+        scored = [
+            ScoredMemory(memory=memory, relevance_score=score)
+            for memory, score in zip(memories, scores)
+            if score > 0
+        ]
 
-        # 按评分排序
-        scored.sort(key=lambda x: x.relevance_score, reverse=True)
+        # 取评分最高的 limit 条（部分选择，无需全量排序）
+        result = heapq.nlargest(limit, scored, key=lambda x: x.relevance_score)
 
         # 触发选中的记忆
-        result = scored[:limit]
         for item in result:
-            self.store.trigger(item.memory.id)
+            self.store.trigger(item.memory.id, now)
 
         return result
 
@@ -112,32 +192,19 @@ class MemoryRetriever:
         lines = ["<user-profile>", "以下是用户的已知特征和偏好：", ""]
 
         # 按类型分组
-        by_type: dict[MemoryType, List[MemoryAtom]] = {}
+        by_type: Dict[MemoryType, List[MemoryAtom]] = defaultdict(list)
         for item in memories:
-            mem_type = item.memory.type
-            if mem_type not in by_type:
-                by_type[mem_type] = []
-            by_type[mem_type].append(item.memory)
-
-        # 类型显示名称
-        type_names = {
-            MemoryType.IDENTITY: "身份背景",
-            MemoryType.VALUE: "价值信念",
-            MemoryType.THINKING: "思维认知",
-            MemoryType.PREFERENCE: "偏好习惯",
-            MemoryType.COMMUNICATION: "沟通表达",
-        }
+            by_type[item.memory.type].append(item.memory)
 
-        current_length = sum(len(line) for line in lines)
+        # 每行计入换行符，之后只做增量累加
+        current_length = sum(len(line) + 1 for line in lines)
 
-        for mem_type in [MemoryType.IDENTITY, MemoryType.VALUE,
-                         MemoryType.THINKING, MemoryType.PREFERENCE,
-                         MemoryType.COMMUNICATION]:
-            type_memories = by_type.get(mem_type, [])
+        for mem_type, type_name in self.TYPE_NAMES.items():
+            type_memories = by_type.get(mem_type)
             if not type_memories:
                 continue
 
-            section_header = f"## {type_names.get(mem_type, mem_type.value)}"
+            section_header = f"## {type_name}"
             if current_length + len(section_header) + 2 > max_length:
                 break
 
@@ -157,6 +224,7 @@ class MemoryRetriever:
                 current_length += len(memory_line) + 1
 
             lines.append("")  # 空行分隔
+            current_length += 1
 
         lines.append("</user-profile>")
         return "\n".join(lines)
@@ -164,9 +232,18 @@ class MemoryRetriever:
     def _calculate_relevance(
         self,
         memory: MemoryAtom,
-        context: Optional[str] = None
+        context_tokens: Optional[FrozenSet[str]] = None
     ) -> float:
-        """计算记忆的相关性评分
+        """计算单条记忆的相关性评分，见 _calculate_relevance_batch"""
+        return self._calculate_relevance_batch([memory], context_tokens)[0]
+
+    def _calculate_relevance_batch(
+        self,
+        memories: List[MemoryAtom],
+        context_tokens: Optional[FrozenSet[str]] = None,
+        now: Optional[datetime] = None,
+    ) -> List[float]:
+        """批量计算记忆的相关性评分
 
         综合考虑：
         1. 置信度（应用时间衰减）
@@ -174,73 +251,114 @@ class MemoryRetriever:
         3. 类型权重
         4. 触发频率
 
+        循环外的不变量（权重表、衰减系数表、上下文）只取一次，
+        时间衰减在循环内直接查表，不再逐条调用 apply_time_decay。
+
         Args:
-            memory: 记忆原子
-            context: 上下文（可选）
+            memories: 记忆列表
+            context_tokens: 上下文关键词集合（可选）
+            now: 当前时间，默认 datetime.now()
 
         Returns:
-            相关性评分 (0-1)
+            与 memories 一一对应的相关性评分 (0-1)
         """
-        # 基础分：衰减后的置信度
-        decayed_confidence = apply_time_decay(memory, self.half_life_days)
-
-        # 层级权重
-        tier_weight = self.TIER_WEIGHTS.get(memory.tier, 0.5)
-
-        # 类型权重
-        type_weight = self.TYPE_WEIGHTS.get(memory.type, 0.5)
+        if now is None:
+            now = datetime.now()
+        half_life_days = self.half_life_days
+        decay_factors = decay_table(half_life_days)
+        weight_table = self._weight_table
+        context_bits = _token_bitmap(context_tokens) if context_tokens else 0
+
+        scores = []
+        for memory in memories:
+            # 基础分：衰减后的置信度 × 层级权重 × 类型权重
+            days = (now - memory.last_triggered_at).days
+            if 0 <= days < DECAY_TABLE_DAYS:
+                decayed = memory.confidence * decay_factors[days]
+            else:
+                decayed = apply_time_decay(memory, half_life_days, now)
+            score = decayed * weight_table[memory.tier][memory.type]
 
-        # 触发频率加成（触发越多越重要，但有上限）
-        trigger_bonus = min(0.2, memory.trigger_count * 0.02)
+            # 触发频率加成（触发越多越重要，但有上限）
+            score += min(0.2, memory.trigger_count * 0.02)
 
-        # 综合评分
-        score = decayed_confidence * tier_weight * type_weight + trigger_bonus
+            # 上下文相关性（如果提供）
+            if context_tokens:
+                context_relevance = self._context_relevance(
+                    memory, context_tokens, context_bits
+                )
+                score = score * 0.7 + context_relevance * 0.3
 
-        # 上下文相关性（如果提供）
-        if context:
-            context_relevance = self._context_relevance(memory, context)
-            score = score * 0.7 + context_relevance * 0.3
+            scores.append(min(1.0, score))
 
-        return min(1.0, score)
+        return scores
 
-    def _context_relevance(self, memory: MemoryAtom, context: str) -> float:
+    def _context_relevance(
+        self,
+        memory: MemoryAtom,
+        context_tokens: FrozenSet[str],
+        context_bits: Optional[int] = None
+    ) -> float:
         """计算与上下文的相关性
 
-        基于简单的关键词匹配。
+        基于关键词集合的交集，先用布隆位图排除一定不相交的记忆。
 
         Args:
             memory: 记忆原子
-            context: 上下文文本
+            context_tokens: 上下文关键词集合
+            context_bits: 上下文布隆位图，为 None 时现场计算
 
         Returns:
             相关性分数 (0-1)
         """
-        context_lower = context.lower()
-        memory_words = set(memory.content.lower().split())
-        memory_words.update(tag.lower() for tag in memory.tags)
-
-        # 计算匹配的词数
-        matches = sum(1 for word in memory_words if word in context_lower)
-
+        memory_words, memory_bits = self._memory_tokens(memory)
         if not memory_words:
             return 0.0
 
+        if context_bits is None:
+            context_bits = _token_bitmap(context_tokens)
+        if not memory_bits & context_bits:
+            return 0.0
+
+        # 计算匹配的词数
+        matches = len(memory_words & context_tokens)
         return min(1.0, matches / len(memory_words))
 
+    def _memory_tokens(self, memory: MemoryAtom) -> Tuple[FrozenSet[str], int]:
+        """获取记忆的关键词集合（内容 + 标签）及其布隆位图，按记忆 ID 缓存"""
+        cached = self._token_cache.get(memory.id)
+        if cached is not None and cached[0] == memory.content and cached[1] == memory.tags:
+            return cached[2], cached[3]
+
+        tokens = _tokenize(memory.content) | _tokenize(" ".join(memory.tags))
+        bits = _token_bitmap(tokens)
+        self._token_cache[memory.id] = (memory.content, list(memory.tags), tokens, bits)
+        return tokens, bits
+
+    def _prune_token_cache(self, memories: List[MemoryAtom]) -> None:
+        """关键词缓存超过上限时只保留本次候选记忆，已删除记忆的条目随之淘汰
+
+        Args:
+            memories: 本次检索的候选记忆
+        """
+        if len(self._token_cache) <= self.TOKEN_CACHE_SIZE:
+            return
+        cache = self._token_cache
+        self._token_cache = {
+            memory.id: cache[memory.id]
+            for memory in memories
+            if memory.id in cache
+        }
+
     def _confidence_indicator(self, confidence: float) -> str:
         """生成置信度指示符
 
+        按 0.2 分档查表：>= 0.8 高，>= 0.6 中等，>= 0.4 较低，其余为空。
+
         Args:
             confidence: 置信度值
 
         Returns:
             置信度指示符字符串
         """
-        if confidence >= 0.8:
-            return "(高置信度)"
-        elif confidence >= 0.6:
-            return "(中等置信度)"
-        elif confidence >= 0.4:
-            return "(较低置信度)"
-        else:
-            return ""
+        return _CONFIDENCE_INDICATORS[min(5, int(confidence * 5))]
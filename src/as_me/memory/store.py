@@ -8,14 +8,30 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+
+from pydantic import TypeAdapter
 
 from ..errors import AsmeError, ErrorCode
 from ..storage.base import ensure_storage_dir, get_storage_path
-from ..storage.json_store import read_json_gz, write_json_gz
+from ..storage.json_store import (
+    append_jsonl,
+    iter_jsonl,
+    read_json_gz_bytes,
+    write_json_gz_bytes,
+)
 from .models import MemoryAtom, MemoryTier, MemoryType
 
 
+# 层级文件整体编解码，直接在 JSON 字节上校验/序列化，不经过中间 dict
+_TIER_ADAPTER = TypeAdapter(List[MemoryAtom])
+
+
+def _detach(memory: MemoryAtom) -> MemoryAtom:
+    """复制记忆，使调用方的修改不会影响缓存"""
+    return memory.model_copy(update={"tags": list(memory.tags)})
+
+
 @dataclass
 class QueryOptions:
     """查询选项"""
@@ -35,6 +51,10 @@ class MemoryStore:
     - short-term.json: 短期记忆
     - working.json: 工作记忆
     - long-term.json: 长期记忆
+
+    触发（trigger）只修改 trigger_count 和 last_triggered_at，
+    这类更新追加到各层级的 .delta.jsonl 日志中，加载时回放；
+    日志超过主文件大小的 DELTA_COMPACT_RATIO 时合并回主文件。
     """
 
     TIER_FILES = {
@@ -43,6 +63,15 @@ class MemoryStore:
         MemoryTier.LONG_TERM: "long-term.json",
     }
 
+    DELTA_FILES = {
+        MemoryTier.SHORT_TERM: "short-term.delta.jsonl",
+        MemoryTier.WORKING: "working.delta.jsonl",
+        MemoryTier.LONG_TERM: "long-term.delta.jsonl",
+    }
+
+    # 增量日志与主文件的大小比例超过此值时合并
+    DELTA_COMPACT_RATIO = 0.25
+
     def __init__(self, storage_root: Path | None = None):
         """初始化存储
 
@@ -53,6 +82,13 @@ class MemoryStore:
         self.memories_dir = self.storage_root / "memories"
         ensure_storage_dir(self.storage_root)
 
+        # 层级缓存: tier -> (文件签名, 记忆列表, id -> 列表下标)
+        # 文件签名为主文件和增量日志的 (mtime_ns, size)，外部修改文件后自动失效
+        self._tier_cache: Dict[
+            MemoryTier,
+            Tuple[Tuple[int, ...], List[MemoryAtom], Dict[str, int]]
+        ] = {}
+
     def save(self, memory: MemoryAtom) -> MemoryAtom:
         """保存单个记忆
 
@@ -62,23 +98,18 @@ class MemoryStore:
         Returns:
             保存后的记忆（可能有更新的时间戳）
         """
-        memories = self._load_tier(memory.tier)
+        memories, id_map = self._load_tier_indexed(memory.tier)
 
-        # 检查是否已存在
-        existing_idx = None
-        for i, m in enumerate(memories):
-            if m["id"] == memory.id:
-                existing_idx = i
-                break
-
-        memory_dict = memory.model_dump(mode="json")
+        stored = _detach(memory)
 
+        existing_idx = id_map.get(memory.id)
         if existing_idx is not None:
-            memories[existing_idx] = memory_dict
+            memories[existing_idx] = stored
         else:
-            memories.append(memory_dict)
+            id_map[memory.id] = len(memories)
+            memories.append(stored)
 
-        self._save_tier(memory.tier, memories)
+        self._save_tier(memory.tier, memories, id_map)
         return memory
 
     def save_batch(self, memories: List[MemoryAtom]) -> List[MemoryAtom]:
@@ -99,23 +130,21 @@ class MemoryStore:
                 by_tier[memory.tier] = []
             by_tier[memory.tier].append(memory)
 
-        # 每个层级批量保存
+        # 每个层级批量保存，通过 id -> 下标索引定位已有记忆
         for tier, tier_memories in by_tier.items():
-            existing = self._load_tier(tier)
-            existing_ids = {m["id"] for m in existing}
+            existing, id_map = self._load_tier_indexed(tier)
 
             for memory in tier_memories:
-                memory_dict = memory.model_dump(mode="json")
-                if memory.id in existing_ids:
+                stored = _detach(memory)
+                existing_idx = id_map.get(memory.id)
+                if existing_idx is not None:
                     # 更新现有记忆
-                    for i, m in enumerate(existing):
-                        if m["id"] == memory.id:
-                            existing[i] = memory_dict
-                            break
+                    existing[existing_idx] = stored
                 else:
-                    existing.append(memory_dict)
+                    id_map[memory.id] = len(existing)
+                    existing.append(stored)
 
-            self._save_tier(tier, existing)
+            self._save_tier(tier, existing, id_map)
 
         return memories
 
@@ -130,10 +159,10 @@ class MemoryStore:
         """
         # 遍历所有层级查找
         for tier in MemoryTier:
-            memories = self._load_tier(tier)
-            for m in memories:
-                if m["id"] == memory_id:
-                    return MemoryAtom.model_validate(m)
+            memories, id_map = self._load_tier_indexed(tier)
+            idx = id_map.get(memory_id)
+            if idx is not None:
+                return _detach(memories[idx])
         return None
 
     def get_all(self, options: QueryOptions | None = None) -> List[MemoryAtom]:
@@ -150,12 +179,10 @@ class MemoryStore:
         # 决定要加载的层级
         tiers_to_load = [options.tier] if options.tier else list(MemoryTier)
 
+        # 先在缓存对象上过滤、排序和分页
         all_memories = []
         for tier in tiers_to_load:
-            tier_data = self._load_tier(tier)
-            for m in tier_data:
-                memory = MemoryAtom.model_validate(m)
-
+            for memory in self._load_tier(tier):
                 # 应用过滤条件
                 if memory.confidence < options.min_confidence:
                     continue
@@ -173,10 +200,10 @@ class MemoryStore:
         sort_key = sort_key_map.get(options.sort_by, sort_key_map["confidence"])
         all_memories.sort(key=sort_key, reverse=options.sort_desc)
 
-        # 分页
+        # 分页，只复制最终返回的记忆
         start = options.offset
         end = start + options.limit
-        return all_memories[start:end]
+        return [_detach(memory) for memory in all_memories[start:end]]
 
     def get_by_type(self, memory_type: MemoryType) -> List[MemoryAtom]:
         """按类型获取记忆
@@ -228,22 +255,83 @@ class MemoryStore:
                 return True
         return False
 
-    def trigger(self, memory_id: str) -> Optional[MemoryAtom]:
+    def apply_transitions(
+        self,
+        deletes: Set[str],
+        moves: Dict[str, MemoryTier],
+    ) -> None:
+        """批量应用层级变化
+
+        每个受影响的层级只读写一次。
+
+        Args:
+            deletes: 要删除的记忆 ID
+            moves: 记忆 ID -> 目标层级
+        """
+        if not deletes and not moves:
+            return
+
+        changed: Set[MemoryTier] = set()
+        removed: Dict[MemoryTier, Set[str]] = {}
+        arriving: Dict[MemoryTier, List[MemoryAtom]] = {}
+
+        for tier in MemoryTier:
+            memories, id_map = self._load_tier_indexed(tier)
+
+            for memory_id in deletes:
+                if memory_id in id_map:
+                    removed.setdefault(tier, set()).add(memory_id)
+                    changed.add(tier)
+
+            for memory_id, target_tier in moves.items():
+                idx = id_map.get(memory_id)
+                if idx is None or target_tier == tier or memory_id in deletes:
+                    continue
+                memory = memories[idx]
+                memory.tier = target_tier
+                removed.setdefault(tier, set()).add(memory_id)
+                arriving.setdefault(target_tier, []).append(memory)
+                changed.update((tier, target_tier))
+
+        for tier in changed:
+            tier_removed = removed.get(tier, set())
+            memories = [m for m in self._load_tier(tier) if m.id not in tier_removed]
+            memories.extend(arriving.get(tier, []))
+            self._save_tier(tier, memories)
+
+    def trigger(
+        self,
+        memory_id: str,
+        triggered_at: Optional[datetime] = None,
+    ) -> Optional[MemoryAtom]:
         """触发记忆（更新 last_triggered_at 和 trigger_count）
 
         Args:
             memory_id: 记忆 ID
+            triggered_at: 触发时间，批量触发时由调用方传入同一时间，默认 datetime.now()
 
         Returns:
             更新后的记忆，不存在时返回 None
         """
-        memory = self.get_by_id(memory_id)
-        if not memory:
-            return None
+        for tier in MemoryTier:
+            memories, id_map = self._load_tier_indexed(tier)
+            idx = id_map.get(memory_id)
+            if idx is None:
+                continue
+
+            memory = memories[idx]
+            memory.last_triggered_at = triggered_at or datetime.now()
+            memory.trigger_count += 1
+            self._append_delta(tier, memory)
+            return _detach(memory)
+        return None
 
-        memory.last_triggered_at = datetime.now()
-        memory.trigger_count += 1
-        return self.save(memory)
+    def compact(self) -> None:
+        """将所有层级的增量日志合并回主文件"""
+        for tier in MemoryTier:
+            if self._delta_path(tier).exists():
+                memories, id_map = self._load_tier_indexed(tier)
+                self._save_tier(tier, memories, id_map)
 
     def count(self, tier: MemoryTier | None = None) -> int:
         """统计记忆数量
@@ -262,23 +350,129 @@ class MemoryStore:
             total += len(self._load_tier(t))
         return total
 
-    def _load_tier(self, tier: MemoryTier) -> List[Dict]:
-        """加载指定层级的记忆"""
+    def _load_tier(self, tier: MemoryTier) -> List[MemoryAtom]:
+        """加载指定层级的记忆
+
+        返回的是缓存本身，对外暴露前需用 _detach 复制。
+        """
+        return self._load_tier_indexed(tier)[0]
+
+    def _load_tier_indexed(self, tier: MemoryTier) -> Tuple[List[MemoryAtom], Dict[str, int]]:
+        """加载指定层级的记忆及 id -> 下标索引
+
+        解析结果按文件签名缓存，文件未变化时直接返回缓存。
+        """
+        signature = self._tier_signature(tier)
+        cached = self._tier_cache.get(tier)
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+
+        raw = read_json_gz_bytes(self.memories_dir / self.TIER_FILES[tier])
+        memories = _TIER_ADAPTER.validate_json(raw) if raw else []
+        id_map = {m.id: i for i, m in enumerate(memories)}
+
+        # 回放增量日志（记录的是绝对值，重复回放结果不变）
+        for delta in iter_jsonl(self._delta_path(tier)):
+            idx = id_map.get(delta.get("id"))
+            if idx is None:
+                continue
+            try:
+                last_triggered_at = datetime.fromisoformat(delta["last_triggered_at"])
+                trigger_count = int(delta["trigger_count"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            memories[idx].last_triggered_at = last_triggered_at
+            memories[idx].trigger_count = trigger_count
+
+        self._tier_cache[tier] = (signature, memories, id_map)
+        return memories, id_map
+
+    def _save_tier(
+        self,
+        tier: MemoryTier,
+        memories: List[MemoryAtom],
+        id_map: Dict[str, int] | None = None,
+    ) -> None:
+        """保存指定层级的记忆
+
+        Args:
+            tier: 记忆层级
+            memories: 该层级的全部记忆
+            id_map: 与 memories 同步的 id -> 下标索引，为 None 时重建
+        """
         file_path = self.memories_dir / self.TIER_FILES[tier]
-        return read_json_gz(file_path) or []
 
-    def _save_tier(self, tier: MemoryTier, memories: List[Dict]) -> None:
-        """保存指定层级的记忆"""
+        # 写入失败时缓存可能已被修改，先丢弃
+        self._tier_cache.pop(tier, None)
+        write_json_gz_bytes(file_path, _TIER_ADAPTER.dump_json(memories))
+
+        # 主文件已包含全部增量，清空日志
+        self._delta_path(tier).unlink(missing_ok=True)
+
+        if id_map is None:
+            id_map = {m.id: i for i, m in enumerate(memories)}
+        self._tier_cache[tier] = (self._tier_signature(tier), memories, id_map)
+
+    def _append_delta(self, tier: MemoryTier, memory: MemoryAtom) -> None:
+        """追加触发增量到日志，日志过大时合并回主文件
+
+        memory 必须是缓存中的对象（已就地更新）。
+        """
+        memories, id_map = self._load_tier_indexed(tier)
+
+        append_jsonl(self._delta_path(tier), [{
+            "id": memory.id,
+            "trigger_count": memory.trigger_count,
+            "last_triggered_at": memory.last_triggered_at.isoformat(),
+        }])
+
+        signature = self._tier_signature(tier)
+        base_size, delta_size = signature[1], signature[3]
+        if delta_size > base_size * self.DELTA_COMPACT_RATIO:
+            self._save_tier(tier, memories, id_map)
+        else:
+            self._tier_cache[tier] = (signature, memories, id_map)
+
+    def _delta_path(self, tier: MemoryTier) -> Path:
+        """获取层级增量日志路径"""
+        return self.memories_dir / self.DELTA_FILES[tier]
+
+    def _tier_signature(self, tier: MemoryTier) -> Tuple[int, ...]:
+        """获取层级文件签名
+
+        由主文件和增量日志的 (mtime_ns, size) 组成，文件不存在时记为 (0, 0)。
+        主文件与 read_json_gz 一致：优先 .json.gz，回退到 .json。
+        """
         file_path = self.memories_dir / self.TIER_FILES[tier]
-        write_json_gz(file_path, memories)
+        base = (0, 0)
+        for path in (file_path.with_name(file_path.name + ".gz"), file_path):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            base = (st.st_mtime_ns, st.st_size)
+            break
+
+        try:
+            st = self._delta_path(tier).stat()
+            delta = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            delta = (0, 0)
+
+        return base + delta
 
     def _remove_from_tier(self, memory_id: str, tier: MemoryTier) -> bool:
         """从指定层级移除记忆"""
-        memories = self._load_tier(tier)
-        original_len = len(memories)
-        memories = [m for m in memories if m["id"] != memory_id]
-
-        if len(memories) < original_len:
-            self._save_tier(tier, memories)
-            return True
-        return False
+        memories, id_map = self._load_tier_indexed(tier)
+        idx = id_map.pop(memory_id, None)
+        if idx is None:
+            return False
+
+        # 与末尾元素交换后弹出，O(1) 删除（层级内顺序无意义，get_all 会重新排序）
+        last = memories.pop()
+        if idx < len(memories):
+            memories[idx] = last
+            id_map[last.id] = idx
+
+        self._save_tier(tier, memories, id_map)
+        return True
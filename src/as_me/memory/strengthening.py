@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from .models import MemoryAtom, MemoryTier
 
@@ -30,6 +30,17 @@ TIER_UPGRADE_THRESHOLDS = {
 }
 
 
+def _tag_mask(tags: List[str], vocab: Dict[str, int]) -> int:
+    """将标签列表编码为位掩码，新标签按出现顺序分配位号"""
+    mask = 0
+    for tag in tags:
+        bit = vocab.get(tag)
+        if bit is None:
+            bit = vocab[tag] = len(vocab)
+        mask |= 1 << bit
+    return mask
+
+
 class MemoryStrengthening:
     """记忆强化器
 
@@ -133,7 +144,8 @@ class MemoryStrengthening:
     ) -> List[MemoryAtom]:
         """查找与给定记忆相似的其他记忆
 
-        简单实现：基于类型和标签匹配
+        简单实现：基于类型和标签匹配。
+        标签集合编码为位掩码，Jaccard 相似度由按位与/或的 bit_count 计算。
 
         Args:
             memory: 待匹配的记忆
@@ -143,7 +155,13 @@ class MemoryStrengthening:
         Returns:
             相似记忆列表
         """
-        matches = []
+        matches: List[MemoryAtom] = []
+        if not memory.tags:
+            return matches
+
+        # 标签词表只在本次调用内有效，位号不受数量限制（Python 整数任意长）
+        vocab: Dict[str, int] = {}
+        memory_mask = _tag_mask(memory.tags, vocab)
 
         for other in all_memories:
             if other.id == memory.id:
@@ -154,13 +172,12 @@ class MemoryStrengthening:
                 continue
 
             # 计算标签重叠度
-            if memory.tags and other.tags:
-                common_tags = set(memory.tags) & set(other.tags)
-                all_tags = set(memory.tags) | set(other.tags)
-                if all_tags:
-                    tag_similarity = len(common_tags) / len(all_tags)
-                    if tag_similarity >= similarity_threshold:
-                        matches.append(other)
+            if other.tags:
+                other_mask = _tag_mask(other.tags, vocab)
+                common = (memory_mask & other_mask).bit_count()
+                tag_similarity = common / (memory_mask | other_mask).bit_count()
+                if tag_similarity >= similarity_threshold:
+                    matches.append(other)
 
         return matches
 
@@ -178,6 +195,9 @@ class MemoryStrengthening:
         Returns:
             更新后的记忆列表
         """
+        if trigger_time is None:
+            trigger_time = datetime.now()
+
         updated = []
         for memory in memories:
             self.trigger(memory, pattern_matched=True, trigger_time=trigger_time)
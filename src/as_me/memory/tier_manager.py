@@ -5,16 +5,17 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import Dict, List, Set, Tuple
 
 from .confidence import apply_time_decay, should_delete_memory
 from .models import MemoryAtom, MemoryTier
-from .store import MemoryStore
+from .store import MemoryStore, QueryOptions
 
 
-@dataclass
+@dataclass(slots=True)
 class TierTransition:
     """层级转换记录"""
     memory_id: str
@@ -87,19 +88,25 @@ class TierManager:
             层级变化记录列表
         """
         transitions = []
+        now = datetime.now()
 
         # 处理每个层级
         for tier in MemoryTier:
-            tier_transitions = self._process_tier(tier)
+            tier_transitions = self._process_tier(tier, now)
             transitions.extend(tier_transitions)
 
         return transitions
 
-    def check_upgrade(self, memory: MemoryAtom) -> MemoryTier | None:
+    def check_upgrade(
+        self,
+        memory: MemoryAtom,
+        now: datetime | None = None,
+    ) -> MemoryTier | None:
         """检查记忆是否可以升级
 
         Args:
             memory: 记忆原子
+            now: 当前时间，默认 datetime.now()
 
         Returns:
             目标层级，不升级时返回 None
@@ -109,8 +116,11 @@ class TierManager:
             # LONG_TERM 不能再升级
             return None
 
+        if now is None:
+            now = datetime.now()
+
         # 检查时间条件
-        days_since_creation = (datetime.now() - memory.created_at).days
+        days_since_creation = (now - memory.created_at).days
         if days_since_creation < threshold["min_days"]:
             return None
 
@@ -119,17 +129,18 @@ class TierManager:
             return None
 
         # 检查置信度（应用衰减后）
-        decayed_confidence = apply_time_decay(memory, self.half_life_days)
+        decayed_confidence = apply_time_decay(memory, self.half_life_days, now)
         if decayed_confidence < threshold["min_confidence"]:
             return None
 
         return threshold["next_tier"]
 
-    def check_delete(self, memory: MemoryAtom) -> bool:
+    def check_delete(self, memory: MemoryAtom, now: datetime | None = None) -> bool:
         """检查记忆是否应该删除
 
         Args:
             memory: 记忆原子
+            now: 当前时间，默认 datetime.now()
 
         Returns:
             是否应该删除
@@ -138,13 +149,16 @@ class TierManager:
         if not threshold:
             return False
 
+        if now is None:
+            now = datetime.now()
+
         # 检查置信度
-        decayed_confidence = apply_time_decay(memory, self.half_life_days)
+        decayed_confidence = apply_time_decay(memory, self.half_life_days, now)
         if decayed_confidence >= threshold["max_confidence"]:
             return False
 
         # 检查不活跃时间
-        days_inactive = (datetime.now() - memory.last_triggered_at).days
+        days_inactive = (now - memory.last_triggered_at).days
         if days_inactive < threshold["inactive_days"]:
             return False
 
@@ -166,25 +180,28 @@ class TierManager:
         # 更新存储（会自动处理跨层级移动）
         return self.store.update(memory)
 
-    def _process_tier(self, tier: MemoryTier) -> List[TierTransition]:
+    def _process_tier(self, tier: MemoryTier, now: datetime) -> List[TierTransition]:
         """处理指定层级的记忆
 
         Args:
             tier: 记忆层级
+            now: 本轮处理统一使用的当前时间
 
         Returns:
             层级变化记录列表
         """
         transitions = []
-        memories = self.store.get_all().copy()
+        # 不限数量：默认 limit 会截断待处理的记忆
+        tier_memories = self.store.get_all(QueryOptions(tier=tier, limit=sys.maxsize))
 
-        # 过滤当前层级
-        tier_memories = [m for m in memories if m.tier == tier]
+        # 先收集变化，最后一次性写入
+        deletes: Set[str] = set()
+        moves: Dict[str, MemoryTier] = {}
 
         for memory in tier_memories:
             # 检查删除
-            if self.check_delete(memory):
-                self.store.delete(memory.id)
+            if self.check_delete(memory, now):
+                deletes.add(memory.id)
                 transitions.append(TierTransition(
                     memory_id=memory.id,
                     from_tier=tier,
@@ -194,9 +211,9 @@ class TierManager:
                 continue
 
             # 检查升级
-            target_tier = self.check_upgrade(memory)
+            target_tier = self.check_upgrade(memory, now)
             if target_tier:
-                self.upgrade(memory, target_tier)
+                moves[memory.id] = target_tier
                 transitions.append(TierTransition(
                     memory_id=memory.id,
                     from_tier=tier,
@@ -204,6 +221,8 @@ class TierManager:
                     reason=f"满足升级条件：触发次数 {memory.trigger_count}，置信度 {memory.confidence:.2f}"
                 ))
 
+        self.store.apply_transitions(deletes, moves)
+
         return transitions
 
 
@@ -7,9 +7,13 @@ from __future__ import annotations
 
 import json
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
 from string import Template
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from ..memory.models import MemoryAtom, MemoryType
 from ..memory.store import MemoryStore
@@ -22,16 +26,32 @@ from .store import PrincipleStore
 AGGREGATION_THRESHOLD = 5  # 同类记忆数量
 MIN_CONFIDENCE = 0.6       # 最低平均置信度
 
+# 并发请求 LLM 的最大线程数
+MAX_LLM_WORKERS = 4
+
+# 单次 LLM 请求合并的候选组数量
+LLM_BATCH_SIZE = 5
+
 
 # 记忆类型到原则维度的映射
 TYPE_TO_DIMENSION = {
-    MemoryType.TECH_PREFERENCE: PrincipleDimension.DOMAIN_THOUGHT,
-    MemoryType.THINKING_PATTERN: PrincipleDimension.DECISION_PATTERN,
-    MemoryType.BEHAVIOR_HABIT: PrincipleDimension.VALUES,
-    MemoryType.LANGUAGE_STYLE: PrincipleDimension.WORLDVIEW,
+    MemoryType.IDENTITY: PrincipleDimension.DOMAIN_THOUGHT,
+    MemoryType.VALUE: PrincipleDimension.VALUES,
+    MemoryType.THINKING: PrincipleDimension.DECISION_PATTERN,
+    MemoryType.PREFERENCE: PrincipleDimension.DOMAIN_THOUGHT,
+    MemoryType.COMMUNICATION: PrincipleDimension.WORLDVIEW,
 }
 
 
+# 取置信度（配合 map 在 C 层完成求和遍历）
+_get_confidence = attrgetter("confidence")
+_get_tags = attrgetter("tags")
+
+
+# LLM 响应中的 ```json 代码块
+_FENCED_JSON = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
+
 AGGREGATION_PROMPT = Template("""分析以下相似的记忆，提取一个统一的原则陈述。
 
 ## 相似记忆
@@ -54,7 +74,31 @@ $memories
 """)
 
 
-@dataclass
+BATCH_AGGREGATION_PROMPT = Template("""以下每一组都是相似的记忆，请为每一组分别提取一个统一的原则陈述。
+
+$groups
+
+## 要求
+1. 每个原则陈述应概括对应组记忆的共同特征
+2. 使用简洁、抽象的语言（不超过 100 字）
+3. 避免具体的技术细节，关注更高层次的偏好或模式
+4. 置信度基于该组记忆的一致性程度
+5. 按组的顺序输出，数组长度与组数一致
+
+## 输出格式
+```json
+[
+  {
+    "statement": "原则陈述",
+    "confidence": 0.0-1.0,
+    "reasoning": "聚合推理说明"
+  }
+]
+```
+""")
+
+
+@dataclass(slots=True)
 class AggregationCandidate:
     """聚合候选"""
     memories: List[MemoryAtom]
@@ -103,26 +147,42 @@ class PrincipleAggregator:
             if len(memories) < AGGREGATION_THRESHOLD:
                 continue
 
-            avg_confidence = sum(m.confidence for m in memories) / len(memories)
+            # 热点字段一次性抽成并列数组，分组和求均值只访问数组
+            confidences = list(map(_get_confidence, memories))
+            avg_confidence = sum(confidences) / len(memories)
             if avg_confidence < MIN_CONFIDENCE:
                 continue
 
-            # 进一步按相似性分组
-            groups = self._group_similar_memories(memories)
-
-            for group in groups:
-                if len(group) >= AGGREGATION_THRESHOLD:
-                    group_avg = sum(m.confidence for m in group) / len(group)
-                    if group_avg >= MIN_CONFIDENCE:
-                        dimension = TYPE_TO_DIMENSION.get(
-                            memory_type,
-                            PrincipleDimension.DOMAIN_THOUGHT
-                        )
-                        candidates.append(AggregationCandidate(
-                            memories=group,
-                            dimension=dimension,
-                            avg_confidence=group_avg,
-                        ))
+            dimension = TYPE_TO_DIMENSION.get(
+                memory_type,
+                PrincipleDimension.DOMAIN_THOUGHT
+            )
+
+            # 未拆分时分组就是整个类型，直接复用类型平均值
+            if len(memories) <= AGGREGATION_THRESHOLD:
+                if len(memories) == AGGREGATION_THRESHOLD:
+                    candidates.append(AggregationCandidate(
+                        memories=memories,
+                        dimension=dimension,
+                        avg_confidence=avg_confidence,
+                    ))
+                continue
+
+            # 进一步按相似性分组，最后才按下标取回记忆对象
+            first_tags = [
+                tags[0] if tags else "default"
+                for tags in map(_get_tags, memories)
+            ]
+            for positions in self._group_similar_indices(first_tags):
+                if len(positions) < AGGREGATION_THRESHOLD:
+                    continue
+                group_avg = sum(confidences[i] for i in positions) / len(positions)
+                if group_avg >= MIN_CONFIDENCE:
+                    candidates.append(AggregationCandidate(
+                        memories=[memories[i] for i in positions],
+                        dimension=dimension,
+                        avg_confidence=group_avg,
+                    ))
 
         return candidates
 
@@ -154,23 +214,49 @@ class PrincipleAggregator:
         Returns:
             更新后的原则
         """
+        evidences = self._attach_evidence(principle, memories)
+        self.evidence_store.save_batch(evidences)
+        self.memory_store.save_batch(memories)
+        return self.principle_store.save(principle)
+
+    def _attach_evidence(
+        self,
+        principle: Principle,
+        memories: List[MemoryAtom],
+        now: Optional[datetime] = None,
+    ) -> List[Evidence]:
+        """在内存中关联原则与记忆，不写入存储
+
+        Args:
+            principle: 原则
+            memories: 相关记忆列表
+            now: 证据时间戳，默认当前时间（同一批证据共用）
+
+        Returns:
+            为每个记忆创建的证据
+        """
+        if now is None:
+            now = datetime.now()
+
         # 为每个记忆创建证据
-        for memory in memories:
-            evidence = Evidence(
+        evidences = [
+            Evidence(
                 principle_id=principle.id,
                 source_session_id=memory.source_session_id,
                 quote=memory.content,
                 weight=memory.confidence,
+                timestamp=now,
             )
-            self.evidence_store.save(evidence)
+            for memory in memories
+        ]
 
-            # 更新记忆的关联原则
+        # 更新记忆的关联原则
+        for memory in memories:
             memory.related_principle_id = principle.id
-            self.memory_store.save(memory)
 
         # 更新原则的证据计数
         principle.evidence_count = len(memories)
-        return self.principle_store.save(principle)
+        return evidences
 
     def process_all_candidates(self) -> List[Principle]:
         """处理所有聚合候选
@@ -179,47 +265,69 @@ class PrincipleAggregator:
             新创建的原则列表
         """
         candidates = self.find_aggregation_candidates()
+        principles = self._aggregate_all(candidates)
         new_principles = []
+        evidences: List[Evidence] = []
+        memories: List[MemoryAtom] = []
+        now = datetime.now()
 
-        for candidate in candidates:
-            principle = self.aggregate(candidate)
+        for candidate, principle in zip(candidates, principles):
             if principle:
-                # 保存原则
-                self.principle_store.save(principle)
-
-                # 添加证据
-                self.update_with_evidence(principle, candidate.memories)
+                # 添加证据，所有候选处理完后各存储只写入一次
+                evidences.extend(self._attach_evidence(principle, candidate.memories, now))
+                memories.extend(candidate.memories)
 
                 new_principles.append(principle)
 
+        if new_principles:
+            self.evidence_store.save_batch(evidences)
+            self.memory_store.save_batch(memories)
+            self.principle_store.save_batch(new_principles)
+
         return new_principles
 
-    def _group_similar_memories(
+    def _aggregate_all(
         self,
-        memories: List[MemoryAtom]
-    ) -> List[List[MemoryAtom]]:
-        """将记忆按相似性分组
+        candidates: List[AggregationCandidate]
+    ) -> List[Optional[Principle]]:
+        """聚合所有候选
 
-        简单实现：基于关键词重叠
+        LLM 模式下每 LLM_BATCH_SIZE 个候选合并为一次请求，
+        各批请求互不依赖，用线程池并发发出。
 
         Args:
-            memories: 记忆列表
+            candidates: 聚合候选列表
 
         Returns:
-            分组后的记忆列表
+            与 candidates 一一对应的原则（失败时为 None）
         """
-        if len(memories) <= AGGREGATION_THRESHOLD:
-            return [memories]
+        if not self.llm_client or len(candidates) <= 1:
+            return [self.aggregate(candidate) for candidate in candidates]
+
+        batches = [
+            candidates[i:i + LLM_BATCH_SIZE]
+            for i in range(0, len(candidates), LLM_BATCH_SIZE)
+        ]
+        workers = min(MAX_LLM_WORKERS, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(self._llm_aggregate_batch, batches)
+            return [principle for batch in results for principle in batch]
+
+    def _group_similar_indices(self, first_tags: List[str]) -> List[List[int]]:
+        """将记忆按相似性分组
 
-        # 简单实现：基于 tags 分组
-        groups: dict[str, List[MemoryAtom]] = {}
+        简单实现：基于 tags 分组
 
-        for memory in memories:
-            # 使用第一个 tag 或 "default" 作为分组键
-            key = memory.tags[0] if memory.tags else "default"
-            if key not in groups:
-                groups[key] = []
-            groups[key].append(memory)
+        Args:
+            first_tags: 每条记忆的第一个 tag，无 tag 时为 "default"
+
+        Returns:
+            分组后的记忆下标列表
+        """
+        groups: dict[str, List[int]] = defaultdict(list)
+
+        for i, tag in enumerate(first_tags):
+            groups[tag].append(i)
 
         # 过滤太小的组
         return [g for g in groups.values() if len(g) >= 2]
@@ -236,15 +344,66 @@ class PrincipleAggregator:
         try:
             response = self.llm_client.complete(prompt)
             result = self._parse_json_response(response)
+            return self._build_principle(candidate, result)
+        except Exception:
+            return self._heuristic_aggregate(candidate)
+
+    def _llm_aggregate_batch(
+        self,
+        candidates: List[AggregationCandidate]
+    ) -> List[Optional[Principle]]:
+        """使用一次 LLM 请求聚合多个候选
+
+        响应应为与候选一一对应的 JSON 数组；整体请求失败时逐个回退到单组请求，
+        单个条目缺失或无效时只对该候选使用启发式聚合。
+
+        Args:
+            candidates: 聚合候选列表
+
+        Returns:
+            与 candidates 一一对应的原则
+        """
+        if len(candidates) == 1:
+            return [self._llm_aggregate(candidates[0])]
 
-            return Principle(
-                dimension=candidate.dimension,
-                statement=result.get("statement", "")[:200],
-                confidence=float(result.get("confidence", candidate.avg_confidence)),
-                evidence_count=len(candidate.memories),
+        groups_text = "\n\n".join(
+            f"## 第 {i} 组\n" + "\n".join(
+                f"- {m.content} (置信度: {m.confidence:.0%})"
+                for m in candidate.memories
             )
+            for i, candidate in enumerate(candidates, 1)
+        )
+        prompt = BATCH_AGGREGATION_PROMPT.substitute(groups=groups_text)
+
+        try:
+            response = self.llm_client.complete(prompt)
         except Exception:
-            return self._heuristic_aggregate(candidate)
+            return [self._llm_aggregate(candidate) for candidate in candidates]
+
+        results = self._parse_json_array_response(response)
+        principles: List[Optional[Principle]] = []
+        for i, candidate in enumerate(candidates):
+            result = results[i] if i < len(results) else None
+            try:
+                if not isinstance(result, dict):
+                    raise ValueError("缺少对应的聚合结果")
+                principles.append(self._build_principle(candidate, result))
+            except Exception:
+                principles.append(self._heuristic_aggregate(candidate))
+        return principles
+
+    def _build_principle(
+        self,
+        candidate: AggregationCandidate,
+        result: Dict[str, Any]
+    ) -> Principle:
+        """由 LLM 返回的单条结果构造原则"""
+        return Principle(
+            dimension=candidate.dimension,
+            statement=result.get("statement", "")[:200],
+            confidence=float(result.get("confidence", candidate.avg_confidence)),
+            evidence_count=len(candidate.memories),
+        )
 
     def _heuristic_aggregate(self, candidate: AggregationCandidate) -> Optional[Principle]:
         """启发式聚合（模拟模式）"""
@@ -261,24 +420,50 @@ class PrincipleAggregator:
             evidence_count=len(candidate.memories),
         )
 
-    def _parse_json_response(self, response: str) -> dict:
-        """解析 JSON 响应"""
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
+    def _parse_json_array_response(self, response: str) -> List[Any]:
+        """解析 JSON 数组响应，无法解析时返回空列表
+
+        与 _parse_json_response 相同，先解析第一个 [ 到最后一个 ] 之间的内容。
+        """
+        start = response.find("[")
+        end = response.rfind("]")
+        if start != -1 and end > start:
+            try:
+                result = json.loads(response[start:end + 1])
+                if isinstance(result, list):
+                    return result
+            except json.JSONDecodeError:
+                pass
 
-        json_match = re.search(r"```json\s*(.*?)\s*```", response, re.DOTALL)
+        json_match = _FENCED_JSON.search(response)
         if json_match:
             try:
-                return json.loads(json_match.group(1))
+                result = json.loads(json_match.group(1))
+                if isinstance(result, list):
+                    return result
             except json.JSONDecodeError:
                 pass
 
-        brace_match = re.search(r"\{.*\}", response, re.DOTALL)
-        if brace_match:
+        return []
+
+    def _parse_json_response(self, response: str) -> dict:
+        """解析 JSON 响应
+
+        先取第一个 { 到最后一个 } 之间的内容解析，纯 JSON、带说明文字或
+        代码块包裹的响应通常一次即可成功；失败时再回退到代码块正则。
+        """
+        start = response.find("{")
+        end = response.rfind("}")
+        if start != -1 and end > start:
             try:
-                return json.loads(brace_match.group(0))
+                return json.loads(response[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+
+        json_match = _FENCED_JSON.search(response)
+        if json_match:
+            try:
+                return json.loads(json_match.group(1))
             except json.JSONDecodeError:
                 pass
 
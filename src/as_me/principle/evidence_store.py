@@ -5,21 +5,35 @@
 
 from __future__ import annotations
 
+from bisect import insort
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import TypeAdapter
 
 from ..storage.base import ensure_storage_dir, get_storage_path
-from ..storage.json_store import read_json, write_json
+from ..storage.record_log import RecordLog
 from .models import Evidence
 
 
+# 批量校验证据记录，整个列表一次进入 pydantic-core
+_EVIDENCE_LIST_ADAPTER = TypeAdapter(List[Evidence])
+
+
 class EvidenceStore:
     """证据存储
 
     存储支撑记忆和原则的证据。
+    证据以 JSON Lines 追加写入，更新和删除追加新行，失效行过多时压缩。
     """
 
-    EVIDENCE_FILE = "evidence/index.json"
+    EVIDENCE_FILE = "evidence/index.jsonl"
+
+    # 旧版整文件 JSON，首次加载时迁移
+    LEGACY_EVIDENCE_FILE = "evidence/index.json"
+
+    # 建立外键索引的字段
+    INDEXED_FIELDS = ("memory_id", "principle_id", "source_session_id")
 
     def __init__(self, storage_root: Path | None = None):
         """初始化存储
@@ -30,6 +44,20 @@ class EvidenceStore:
         self.storage_root = storage_root or get_storage_path()
         self.evidence_file = self.storage_root / self.EVIDENCE_FILE
         ensure_storage_dir(self.storage_root)
+        self._log = RecordLog(
+            self.evidence_file,
+            legacy_path=self.storage_root / self.LEGACY_EVIDENCE_FILE,
+        )
+
+        # 证据缓存及索引，按日志文件签名 (mtime_ns, size) 失效
+        self._cache_signature: Optional[Tuple[int, int]] = None
+        # 删除的证据在缓存中留空位 None，避免整表重建
+        self._cache: List[Optional[Dict[str, Any]]] = []
+        self._holes = 0
+        # id -> 列表下标
+        self._id_index: Dict[str, int] = {}
+        # 字段名 -> 字段值 -> 列表下标
+        self._field_index: Dict[str, Dict[str, List[int]]] = {}
 
     def save(self, evidence: Evidence) -> Evidence:
         """保存证据
@@ -40,24 +68,7 @@ class EvidenceStore:
         Returns:
             保存后的证据
         """
-        all_evidence = self._load_all()
-
-        # 检查是否已存在
-        existing_idx = None
-        for i, e in enumerate(all_evidence):
-            if e["id"] == evidence.id:
-                existing_idx = i
-                break
-
-        evidence_dict = evidence.model_dump(mode="json")
-
-        if existing_idx is not None:
-            all_evidence[existing_idx] = evidence_dict
-        else:
-            all_evidence.append(evidence_dict)
-
-        self._save_all(all_evidence)
-        return evidence
+        return self.save_batch([evidence])[0]
 
     def save_batch(self, evidences: List[Evidence]) -> List[Evidence]:
         """批量保存证据
@@ -68,20 +79,26 @@ class EvidenceStore:
         Returns:
             保存后的证据列表
         """
-        all_evidence = self._load_all()
-        existing_ids = {e["id"] for e in all_evidence}
+        cache = self._load_all()
 
+        # 与已存储内容相同的证据无需写入
+        changed = []
         for evidence in evidences:
-            evidence_dict = evidence.model_dump(mode="json")
-            if evidence.id in existing_ids:
-                for i, e in enumerate(all_evidence):
-                    if e["id"] == evidence.id:
-                        all_evidence[i] = evidence_dict
-                        break
-            else:
-                all_evidence.append(evidence_dict)
-
-        self._save_all(all_evidence)
+            record = evidence.model_dump(mode="json")
+            idx = self._id_index.get(evidence.id)
+            if idx is None or cache[idx] != record:
+                changed.append((evidence, record))
+        if not changed:
+            return evidences
+
+        # 写入失败时缓存可能与文件不一致，先失效
+        self._cache_signature = None
+        self._log.append_encoded(evidence.model_dump_json() for evidence, _ in changed)
+        for _, record in changed:
+            self._put(record)
+        self._compact_if_needed()
+        self._cache_signature = self._log.signature()
+
         return evidences
 
     def get_by_id(self, evidence_id: str) -> Optional[Evidence]:
@@ -94,10 +111,10 @@ class EvidenceStore:
             证据对象，不存在时返回 None
         """
         all_evidence = self._load_all()
-        for e in all_evidence:
-            if e["id"] == evidence_id:
-                return Evidence.model_validate(e)
-        return None
+        idx = self._id_index.get(evidence_id)
+        if idx is None:
+            return None
+        return Evidence.model_validate(all_evidence[idx])
 
     def get_by_memory(self, memory_id: str) -> List[Evidence]:
         """获取记忆的所有证据
@@ -108,12 +125,7 @@ class EvidenceStore:
         Returns:
             证据列表
         """
-        all_evidence = self._load_all()
-        result = []
-        for e in all_evidence:
-            if e.get("memory_id") == memory_id:
-                result.append(Evidence.model_validate(e))
-        return result
+        return self._lookup("memory_id", memory_id)
 
     def get_by_principle(self, principle_id: str) -> List[Evidence]:
         """获取原则的所有证据
@@ -124,12 +136,7 @@ class EvidenceStore:
         Returns:
             证据列表
         """
-        all_evidence = self._load_all()
-        result = []
-        for e in all_evidence:
-            if e.get("principle_id") == principle_id:
-                result.append(Evidence.model_validate(e))
-        return result
+        return self._lookup("principle_id", principle_id)
 
     def get_by_session(self, session_id: str) -> List[Evidence]:
         """获取会话的所有证据
@@ -140,12 +147,7 @@ class EvidenceStore:
         Returns:
             证据列表
         """
-        all_evidence = self._load_all()
-        result = []
-        for e in all_evidence:
-            if e.get("source_session_id") == session_id:
-                result.append(Evidence.model_validate(e))
-        return result
+        return self._lookup("source_session_id", session_id)
 
     def delete(self, evidence_id: str) -> bool:
         """删除证据
@@ -156,14 +158,12 @@ class EvidenceStore:
         Returns:
             是否成功删除
         """
-        all_evidence = self._load_all()
-        original_len = len(all_evidence)
-        all_evidence = [e for e in all_evidence if e["id"] != evidence_id]
+        self._load_all()
+        if evidence_id not in self._id_index:
+            return False
 
-        if len(all_evidence) < original_len:
-            self._save_all(all_evidence)
-            return True
-        return False
+        self._remove({evidence_id})
+        return True
 
     def delete_by_memory(self, memory_id: str) -> int:
         """删除记忆的所有证据
@@ -174,14 +174,7 @@ class EvidenceStore:
         Returns:
             删除的证据数量
         """
-        all_evidence = self._load_all()
-        original_len = len(all_evidence)
-        all_evidence = [e for e in all_evidence if e.get("memory_id") != memory_id]
-
-        deleted = original_len - len(all_evidence)
-        if deleted > 0:
-            self._save_all(all_evidence)
-        return deleted
+        return self._delete_where("memory_id", memory_id)
 
     def delete_by_principle(self, principle_id: str) -> int:
         """删除原则的所有证据
@@ -192,14 +185,7 @@ class EvidenceStore:
         Returns:
             删除的证据数量
         """
-        all_evidence = self._load_all()
-        original_len = len(all_evidence)
-        all_evidence = [e for e in all_evidence if e.get("principle_id") != principle_id]
-
-        deleted = original_len - len(all_evidence)
-        if deleted > 0:
-            self._save_all(all_evidence)
-        return deleted
+        return self._delete_where("principle_id", principle_id)
 
     def count(self) -> int:
         """统计证据数量
@@ -207,12 +193,122 @@ class EvidenceStore:
         Returns:
             证据数量
         """
-        return len(self._load_all())
+        self._load_all()
+        return len(self._id_index)
+
+    def _lookup(self, field: str, value: str) -> List[Evidence]:
+        """通过外键索引查找证据，只校验命中的记录"""
+        all_evidence = self._load_all()
+        positions = self._field_index[field].get(value, [])
+        return _EVIDENCE_LIST_ADAPTER.validate_python([all_evidence[i] for i in positions])
 
-    def _load_all(self) -> List[Dict]:
-        """加载所有证据"""
-        return read_json(self.evidence_file) or []
+    def _delete_where(self, field: str, value: str) -> int:
+        """删除指定字段等于 value 的所有证据
 
-    def _save_all(self, evidences: List[Dict]) -> None:
-        """保存所有证据"""
-        write_json(self.evidence_file, evidences)
+        Returns:
+            删除的证据数量
+        """
+        all_evidence = self._load_all()
+        positions = self._field_index[field].get(value, [])
+        if not positions:
+            return 0
+
+        evidence_ids: Set[str] = set()
+        for i in positions:
+            record = all_evidence[i]
+            if record is not None:
+                evidence_ids.add(record["id"])
+        self._remove(evidence_ids)
+        return len(evidence_ids)
+
+    def _remove(self, evidence_ids: Set[str]) -> None:
+        """追加墓碑删除证据，并同步缓存
+
+        只清理命中记录的缓存槽位和索引项，耗时与删除数量成正比。
+        """
+        self._cache_signature = None
+        self._log.delete(evidence_ids)
+        for evidence_id in evidence_ids:
+            idx = self._id_index.pop(evidence_id)
+            record = self._cache[idx]
+            if record is None:
+                continue
+            self._cache[idx] = None
+            self._holes += 1
+            for field, index in self._field_index.items():
+                value = record.get(field)
+                if value is None:
+                    continue
+                positions = index[value]
+                positions.remove(idx)
+                if not positions:
+                    del index[value]
+        self._compact_if_needed()
+        self._cache_signature = self._log.signature()
+
+    def _compact_if_needed(self) -> None:
+        """日志失效行过多时压缩；缓存空位过半时收紧缓存"""
+        if self._log.needs_compaction(len(self._id_index)):
+            live = [e for e in self._cache if e is not None]
+            self._log.rewrite(live)
+            self._set_cache(live)
+        elif self._holes > len(self._cache) // 2:
+            self._set_cache([e for e in self._cache if e is not None])
+
+    def _load_all(self) -> List[Optional[Dict[str, Any]]]:
+        """加载所有证据
+
+        返回的是缓存本身，调用方不得就地修改；已删除的槽位为 None，
+        只应通过索引访问。
+        """
+        if self._log.signature() != self._cache_signature:
+            self._set_cache(self._log.load())
+            self._cache_signature = self._log.signature()
+        return self._cache
+
+    def _put(self, record: Dict[str, Any]) -> None:
+        """新增或替换缓存中的一条证据，增量维护索引"""
+        idx = self._id_index.get(record["id"])
+        if idx is None:
+            # 新证据排在末尾，直接追加到各索引列表
+            idx = self._id_index[record["id"]] = len(self._cache)
+            self._cache.append(record)
+            for field, index in self._field_index.items():
+                value = record.get(field)
+                if value is not None:
+                    index.setdefault(value, []).append(idx)
+            return
+
+        # id 索引只指向有效槽位，old 不会为 None
+        old = self._cache[idx] or {}
+        self._cache[idx] = record
+        for field, index in self._field_index.items():
+            old_value, new_value = old.get(field), record.get(field)
+            if old_value == new_value:
+                continue
+            if old_value is not None:
+                index[old_value].remove(idx)
+                if not index[old_value]:
+                    del index[old_value]
+            if new_value is not None:
+                insort(index.setdefault(new_value, []), idx)
+
+    def _set_cache(self, evidences: List[Dict[str, Any]]) -> None:
+        """设置缓存并一次遍历建立全部索引"""
+        id_index: Dict[str, int] = {}
+        field_index: Dict[str, Dict[str, List[int]]] = {
+            field: {} for field in self.INDEXED_FIELDS
+        }
+        for i, e in enumerate(evidences):
+            id_index[e["id"]] = i
+            for field, index in field_index.items():
+                value = e.get(field)
+                if value is not None:
+                    index.setdefault(value, []).append(i)
+
+        # 缓存中删除的槽位会被置为 None
+        cache: List[Optional[Dict[str, Any]]] = list(evidences)
+        self._cache = cache
+        self._holes = 0
+        self._id_index = id_index
+        self._field_index = field_index
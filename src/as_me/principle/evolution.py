@@ -5,25 +5,76 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
-from typing import List, Optional
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter
 
 from ..storage import get_storage_path
-from ..storage.json_store import read_json_gz, write_json_gz
+from ..storage.json_store import iter_jsonl_gz, read_json, write_json, write_jsonl_gz
+from ..storage.record_log import RecordLog
 from .models import EvolutionEvent, EvolutionTrigger
 
+_get_timestamp = attrgetter("timestamp")
+
+# 批量校验事件记录，整个列表一次进入 pydantic-core
+_EVENT_LIST_ADAPTER = TypeAdapter(List[EvolutionEvent])
+
+
+def _iter_descending(events: List[EvolutionEvent], lo: int, hi: int) -> Iterator[EvolutionEvent]:
+    """按时间倒序遍历 events[lo:hi]，时间相同的事件保持写入顺序
+
+    与 sorted(..., reverse=True) 的结果一致：从末尾按时间分组，
+    每组内正序输出。
+
+    Args:
+        events: 按时间正序排列的事件列表
+        lo: 起始下标（含）
+        hi: 结束下标（不含）
+    """
+    end = hi
+    while end > lo:
+        start = bisect_left(events, events[end - 1].timestamp, lo, end, key=_get_timestamp)
+        yield from events[start:end]
+        end = start
+
 
 class EvolutionTracker:
     """演化追踪器
 
     负责记录和查询原则的演化历史。
+    事件只追加不修改，以 JSON Lines 每行一个事件存储：
+    - 活动分段 history.jsonl 接收新事件
+    - 活动分段超过 SEGMENT_MAX_BYTES 时封存为 history.NNNNNN.jsonl.gz
+    - segments.json 记录每个封存分段包含的原则 ID，按原则查询时跳过无关分段
     """
 
-    EVOLUTION_FILE = "evolution/history.json"
+    EVOLUTION_FILE = "evolution/history.jsonl"
+
+    # 旧版整文件 JSON（gzip 压缩），首次加载时迁移
+    LEGACY_EVOLUTION_FILE = "evolution/history.json"
+
+    # 封存分段索引：分段文件名 -> 包含的原则 ID 列表（按封存顺序）
+    SEGMENT_INDEX_FILE = "evolution/segments.json"
+
+    # 活动分段封存阈值（字节）
+    SEGMENT_MAX_BYTES = 1024 * 1024
 
     def __init__(self):
         """初始化演化追踪器"""
         self._file_path = get_storage_path(self.EVOLUTION_FILE)
+        self._segment_index_path = get_storage_path(self.SEGMENT_INDEX_FILE)
+        self._log = RecordLog(
+            self._file_path,
+            legacy_path=get_storage_path(self.LEGACY_EVOLUTION_FILE),
+        )
+
+        # 已解析事件缓存（按时间正序），按活动分段和分段索引的文件签名失效
+        self._cache_signature: Optional[Tuple[int, ...]] = None
+        self._cache: List[EvolutionEvent] = []
 
     def record_event(
         self,
@@ -55,17 +106,37 @@ class EvolutionTracker:
             reason=reason,
             evidence_ids=evidence_ids or [],
         )
+        self.record_events([event])
+        return event
 
-        # 读取现有事件
-        events = self._load_events()
-
-        # 添加新事件
-        events.append(event)
+    def record_events(self, events: List[EvolutionEvent]) -> List[EvolutionEvent]:
+        """批量记录演化事件，一次追加写入
 
-        # 保存
-        self._save_events(events)
+        Args:
+            events: 演化事件列表
 
-        return event
+        Returns:
+            记录的演化事件列表
+        """
+        if not events:
+            return events
+
+        # 追加新事件，无需读取已有事件；首次写入前先迁移旧版文件
+        if not self._file_path.exists():
+            self._log.load()
+
+        # 缓存有效时直接追加，避免下次查询重新解析所有分段
+        cache_valid = self._cache_signature == self._signature()
+        self._log.append_encoded(event.model_dump_json() for event in events)
+        if self._file_path.stat().st_size > self.SEGMENT_MAX_BYTES:
+            self._seal_active_segment()
+        if cache_valid:
+            # 事件通常按时间追加，insort 只在时钟回拨时才需要移动元素
+            for event in events:
+                insort(self._cache, event, key=_get_timestamp)
+            self._cache_signature = self._signature()
+
+        return events
 
     def get_history(self, principle_id: str) -> List[EvolutionEvent]:
         """获取指定原则的演化历史
@@ -76,9 +147,12 @@ class EvolutionTracker:
         Returns:
             演化事件列表（按时间正序）
         """
-        events = self._load_events()
-        principle_events = [e for e in events if e.principle_id == principle_id]
-        return sorted(principle_events, key=lambda e: e.timestamp)
+        # 缓存失效时只读取包含该原则的分段
+        if self._cache_signature == self._signature():
+            events = self._cache
+        else:
+            events = self._read_events(principle_id)
+        return [e for e in events if e.principle_id == principle_id]
 
     def get_timeline(
         self,
@@ -102,26 +176,21 @@ class EvolutionTracker:
         Returns:
             演化事件列表（按时间倒序）
         """
-        events = self._load_events()
+        events = self._get_cache()
+
+        # 缓存按时间正序，二分定位时间窗口
+        lo = bisect_left(events, start_time, key=_get_timestamp) if start_time else 0
+        hi = bisect_right(events, end_time, key=_get_timestamp) if end_time else len(events)
 
-        # 应用过滤条件
+        # 从窗口末尾倒序过滤，取满 limit 条即停止
+        window = _iter_descending(events, lo, hi)
         if principle_id:
-            events = [e for e in events if e.principle_id == principle_id]
+            window = (e for e in window if e.principle_id == principle_id)
 
         if trigger:
-            events = [e for e in events if e.trigger == trigger]
-
-        if start_time:
-            events = [e for e in events if e.timestamp >= start_time]
-
-        if end_time:
-            events = [e for e in events if e.timestamp <= end_time]
-
-        # 按时间倒序排序
-        events = sorted(events, key=lambda e: e.timestamp, reverse=True)
+            window = (e for e in window if e.trigger == trigger)
 
-        # 限制数量
-        return events[:limit]
+        return list(islice(window, limit))
 
     def get_all(self) -> List[EvolutionEvent]:
         """获取所有演化事件
@@ -132,13 +201,68 @@ class EvolutionTracker:
         return self._load_events()
 
     def _load_events(self) -> List[EvolutionEvent]:
-        """加载演化事件"""
-        data = read_json_gz(self._file_path)
-        if not data:
-            return []
-        return [EvolutionEvent.model_validate(item) for item in data]
-
-    def _save_events(self, events: List[EvolutionEvent]) -> None:
-        """保存演化事件"""
-        data = [event.model_dump(mode="json") for event in events]
-        write_json_gz(self._file_path, data)
+        """加载演化事件
+
+        返回缓存列表的浅拷贝，调用方可以自由过滤和排序。
+        """
+        return list(self._get_cache())
+
+    def _get_cache(self) -> List[EvolutionEvent]:
+        """获取事件缓存，文件变化时重新读取
+
+        返回的是缓存本身，调用方不得就地修改。
+        """
+        if self._signature() != self._cache_signature:
+            self._cache = self._read_events()
+            self._cache_signature = self._signature()
+        return self._cache
+
+    def _read_events(self, principle_id: Optional[str] = None) -> List[EvolutionEvent]:
+        """按封存顺序读取所有分段，最后读取活动分段
+
+        Args:
+            principle_id: 指定时跳过索引中不包含该原则的封存分段
+
+        Returns:
+            演化事件列表（按时间正序）
+        """
+        # 按 id 去重：封存过程中断时同一事件可能同时出现在两个分段
+        records: Dict[str, Dict[str, Any]] = {}
+        for name, principle_ids in self._load_segment_index().items():
+            if principle_id is not None and principle_id not in principle_ids:
+                continue
+            for record in iter_jsonl_gz(self._file_path.parent / name):
+                if isinstance(record, dict) and "id" in record:
+                    records[record["id"]] = record
+        for record in self._log.load():
+            records[record["id"]] = record
+
+        events = _EVENT_LIST_ADAPTER.validate_python(list(records.values()))
+        # 写入顺序即时间顺序，已有序时 sort 只需一次线性检查
+        events.sort(key=_get_timestamp)
+        return events
+
+    def _seal_active_segment(self) -> None:
+        """将活动分段压缩封存，并登记到分段索引"""
+        records = self._log.load()
+        index = self._load_segment_index()
+
+        name = f"history.{len(index) + 1:06d}.jsonl.gz"
+        write_jsonl_gz(self._file_path.parent / name, records)
+        index[name] = sorted({r["principle_id"] for r in records if "principle_id" in r})
+        write_json(self._segment_index_path, index)
+
+        self._log.rewrite([])
+
+    def _load_segment_index(self) -> Dict[str, List[str]]:
+        """加载封存分段索引"""
+        return read_json(self._segment_index_path) or {}
+
+    def _signature(self) -> Tuple[int, ...]:
+        """活动分段与分段索引的文件签名（封存分段不可变，无需检查）"""
+        try:
+            st = self._segment_index_path.stat()
+            index_signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            index_signature = (0, 0)
+        return self._log.signature() + index_signature
@@ -7,21 +7,34 @@ from __future__ import annotations
 
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
 
 from ..errors import AsmeError, ErrorCode
 from ..storage.base import ensure_storage_dir, get_storage_path
-from ..storage.json_store import read_json_gz, write_json_gz
-from .models import EvolutionTrigger, Principle, PrincipleDimension
+from ..storage.record_log import RecordLog
+from .models import EvolutionEvent, EvolutionTrigger, Principle, PrincipleDimension
+
+if TYPE_CHECKING:
+    from .evolution import EvolutionTracker
+
+
+# 批量校验原则记录，整个列表一次进入 pydantic-core
+_PRINCIPLE_LIST_ADAPTER = TypeAdapter(List[Principle])
 
 
 class PrincipleStore:
     """原则存储
 
     存储和管理内核原则。
+    原则以 JSON Lines 追加写入，更新和删除追加新行，失效行过多时压缩。
     """
 
-    PRINCIPLES_FILE = "principles/core.json"
+    PRINCIPLES_FILE = "principles/core.jsonl"
+
+    # 旧版整文件 JSON（gzip 压缩），首次加载时迁移
+    LEGACY_PRINCIPLES_FILE = "principles/core.json"
 
     def __init__(self, storage_root: Path | None = None):
         """初始化存储
@@ -32,6 +45,23 @@ class PrincipleStore:
         self.storage_root = storage_root or get_storage_path()
         self.principles_file = self.storage_root / self.PRINCIPLES_FILE
         ensure_storage_dir(self.storage_root)
+        self._log = RecordLog(
+            self.principles_file,
+            legacy_path=self.storage_root / self.LEGACY_PRINCIPLES_FILE,
+        )
+
+        # 原则缓存及 id -> 下标索引，按日志文件签名 (mtime_ns, size) 失效
+        self._cache_signature: Optional[Tuple[int, int]] = None
+        self._cache: List[Dict[str, Any]] = []
+        self._id_index: Dict[str, int] = {}
+
+        # 派生索引，缓存变化后置为 None，下次查询时重建
+        # 维度 -> 下标列表；活跃原则下标（按置信度降序）
+        self._dimension_index: Optional[Dict[str, List[int]]] = None
+        self._active_sorted: Optional[List[int]] = None
+
+        # 演化追踪器，首次记录演化事件时创建并复用（复用其事件缓存）
+        self._tracker: Optional["EvolutionTracker"] = None
 
     def save(self, principle: Principle) -> Principle:
         """保存原则
@@ -42,24 +72,45 @@ class PrincipleStore:
         Returns:
             保存后的原则
         """
-        principles = self._load_all()
+        return self.save_batch([principle])[0]
 
-        # 检查是否已存在
-        existing_idx = None
-        for i, p in enumerate(principles):
-            if p["id"] == principle.id:
-                existing_idx = i
-                break
+    def save_batch(self, principles: List[Principle]) -> List[Principle]:
+        """批量保存原则，一次追加写入
 
-        principle_dict = principle.model_dump(mode="json")
-
-        if existing_idx is not None:
-            principles[existing_idx] = principle_dict
-        else:
-            principles.append(principle_dict)
+        Args:
+            principles: 原则列表
 
-        self._save_all(principles)
-        return principle
+        Returns:
+            保存后的原则列表
+        """
+        cache = self._load_all()
+
+        # 与已存储内容相同的原则无需写入
+        changed = []
+        for principle in principles:
+            principle_dict = principle.model_dump(mode="json")
+            existing_idx = self._id_index.get(principle.id)
+            if existing_idx is None or cache[existing_idx] != principle_dict:
+                changed.append((principle, principle_dict))
+        if not changed:
+            return principles
+
+        # 追加新行，加载时覆盖同 id 的旧版本
+        self._cache_signature = None
+        self._log.append_encoded(principle.model_dump_json() for principle, _ in changed)
+
+        for principle, principle_dict in changed:
+            existing_idx = self._id_index.get(principle.id)
+            if existing_idx is not None:
+                cache[existing_idx] = principle_dict
+            else:
+                self._id_index[principle.id] = len(cache)
+                cache.append(principle_dict)
+        self._log.compact_if_needed(cache)
+        self._invalidate_views()
+
+        self._cache_signature = self._log.signature()
+        return principles
 
     def get_by_id(self, principle_id: str) -> Optional[Principle]:
         """根据 ID 获取原则
@@ -71,10 +122,10 @@ class PrincipleStore:
             原则对象，不存在时返回 None
         """
         principles = self._load_all()
-        for p in principles:
-            if p["id"] == principle_id:
-                return Principle.model_validate(p)
-        return None
+        idx = self._id_index.get(principle_id)
+        if idx is None:
+            return None
+        return Principle.model_validate(principles[idx])
 
     def get_by_dimension(self, dimension: PrincipleDimension) -> List[Principle]:
         """按维度获取原则
@@ -86,11 +137,8 @@ class PrincipleStore:
             指定维度的原则列表
         """
         principles = self._load_all()
-        result = []
-        for p in principles:
-            if p["dimension"] == dimension.value:
-                result.append(Principle.model_validate(p))
-        return result
+        positions = self._get_dimension_index().get(dimension.value, [])
+        return _PRINCIPLE_LIST_ADAPTER.validate_python([principles[i] for i in positions])
 
     def get_active(self) -> List[Principle]:
         """获取所有活跃原则
@@ -99,15 +147,9 @@ class PrincipleStore:
             活跃原则列表（按置信度排序）
         """
         principles = self._load_all()
-        result = []
-        for p in principles:
-            principle = Principle.model_validate(p)
-            if principle.active:
-                result.append(principle)
-
-        # 按置信度排序
-        result.sort(key=lambda p: p.confidence, reverse=True)
-        return result
+        return _PRINCIPLE_LIST_ADAPTER.validate_python(
+            [principles[i] for i in self._get_active_sorted()]
+        )
 
     def get_all(self) -> List[Principle]:
         """获取所有原则
@@ -116,7 +158,7 @@ class PrincipleStore:
             所有原则列表
         """
         principles = self._load_all()
-        return [Principle.model_validate(p) for p in principles]
+        return _PRINCIPLE_LIST_ADAPTER.validate_python(principles)
 
     def update(self, principle: Principle) -> Principle:
         """更新原则
@@ -154,28 +196,46 @@ class PrincipleStore:
         Raises:
             AsmeError: 原则不存在时
         """
-        principle = self.get_by_id(principle_id)
-        if not principle:
-            raise AsmeError(
-                ErrorCode.PRINCIPLE_NOT_FOUND,
-                f"原则不存在: {principle_id}"
-            )
+        return self.confirm_batch([principle_id])[0]
 
-        previous_confidence = principle.confidence
-        principle.confirmed_by_user = True
-        principle.confidence = min(1.0, principle.confidence + 0.2)  # 确认后提升置信度
-        principle.updated_at = datetime.now()
+    def confirm_batch(self, principle_ids: List[str]) -> List[Principle]:
+        """批量确认原则
+
+        演化事件和原则各一次追加写入。重复的 ID 依次作用在同一原则上。
+
+        Args:
+            principle_ids: 原则 ID 列表
+
+        Returns:
+            确认后的原则列表（每个原则一条）
+
+        Raises:
+            AsmeError: 任一原则不存在时（不写入任何变更）
+        """
+        principles = self._get_existing(principle_ids)
+        by_id = {principle.id: principle for principle in principles}
+        now = datetime.now()
+
+        events = []
+        for principle_id in principle_ids:
+            principle = by_id[principle_id]
+            previous_confidence = principle.confidence
+            principle.confirmed_by_user = True
+            principle.confidence = min(1.0, principle.confidence + 0.2)  # 确认后提升置信度
+            principle.updated_at = now
+            events.append(EvolutionEvent(
+                principle_id=principle.id,
+                previous_confidence=previous_confidence,
+                new_confidence=principle.confidence,
+                trigger=EvolutionTrigger.USER_CONFIRMATION,
+                reason="用户确认原则",
+                timestamp=now,
+            ))
 
         # 记录演化事件
-        self._record_evolution(
-            principle_id=principle.id,
-            previous_confidence=previous_confidence,
-            new_confidence=principle.confidence,
-            trigger=EvolutionTrigger.USER_CONFIRMATION,
-            reason="用户确认原则",
-        )
+        self._record_evolution(events)
 
-        return self.save(principle)
+        return self.save_batch(principles)
 
     def correct(self, principle_id: str, new_statement: str, reason: str) -> Principle:
         """修正原则
@@ -193,28 +253,45 @@ class PrincipleStore:
         Raises:
             AsmeError: 原则不存在时
         """
-        principle = self.get_by_id(principle_id)
-        if not principle:
-            raise AsmeError(
-                ErrorCode.PRINCIPLE_NOT_FOUND,
-                f"原则不存在: {principle_id}"
-            )
+        return self.correct_batch([(principle_id, new_statement, reason)])[0]
 
-        previous_confidence = principle.confidence
-        principle.statement = new_statement
-        principle.confirmed_by_user = True  # 用户修正也视为确认
-        principle.updated_at = datetime.now()
+    def correct_batch(self, updates: List[Tuple[str, str, str]]) -> List[Principle]:
+        """批量修正原则
+
+        演化事件和原则各一次追加写入。重复的 ID 依次作用在同一原则上。
+
+        Args:
+            updates: (原则 ID, 新的原则陈述, 修正原因) 列表
+
+        Returns:
+            修正后的原则列表（每个原则一条）
+
+        Raises:
+            AsmeError: 任一原则不存在时（不写入任何变更）
+        """
+        principles = self._get_existing([principle_id for principle_id, _, _ in updates])
+        by_id = {principle.id: principle for principle in principles}
+        now = datetime.now()
+
+        events = []
+        for principle_id, new_statement, reason in updates:
+            principle = by_id[principle_id]
+            principle.statement = new_statement
+            principle.confirmed_by_user = True  # 用户修正也视为确认
+            principle.updated_at = now
+            events.append(EvolutionEvent(
+                principle_id=principle.id,
+                previous_confidence=principle.confidence,
+                new_confidence=principle.confidence,
+                trigger=EvolutionTrigger.USER_CORRECTION,
+                reason=reason,
+                timestamp=now,
+            ))
 
         # 记录演化事件
-        self._record_evolution(
-            principle_id=principle.id,
-            previous_confidence=previous_confidence,
-            new_confidence=principle.confidence,
-            trigger=EvolutionTrigger.USER_CORRECTION,
-            reason=reason,
-        )
+        self._record_evolution(events)
 
-        return self.save(principle)
+        return self.save_batch(principles)
 
     def delete(self, principle_id: str) -> bool:
         """删除原则
@@ -226,13 +303,15 @@ class PrincipleStore:
             是否成功删除
         """
         principles = self._load_all()
-        original_len = len(principles)
-        principles = [p for p in principles if p["id"] != principle_id]
+        if principle_id not in self._id_index:
+            return False
 
-        if len(principles) < original_len:
-            self._save_all(principles)
-            return True
-        return False
+        self._cache_signature = None
+        self._log.delete([principle_id])
+        self._set_cache([p for p in principles if p["id"] != principle_id])
+        self._log.compact_if_needed(self._cache)
+        self._cache_signature = self._log.signature()
+        return True
 
     def deactivate(self, principle_id: str) -> Principle:
         """停用原则
@@ -263,45 +342,81 @@ class PrincipleStore:
         Returns:
             原则数量
         """
+        principles = self._load_all()
         if active_only:
-            return len(self.get_active())
-        return len(self._load_all())
-
-    def _load_all(self) -> List[Dict]:
-        """加载所有原则"""
-        return read_json_gz(self.principles_file) or []
-
-    def _save_all(self, principles: List[Dict]) -> None:
-        """保存所有原则"""
-        write_json_gz(self.principles_file, principles)
-
-    def _record_evolution(
-        self,
-        principle_id: str,
-        previous_confidence: float,
-        new_confidence: float,
-        trigger: EvolutionTrigger,
-        reason: str,
-        evidence_ids: Optional[List[str]] = None,
-    ) -> None:
-        """记录演化事件
+            return len(self._get_active_sorted())
+        return len(principles)
+
+    def _load_all(self) -> List[Dict[str, Any]]:
+        """加载所有原则
+
+        返回的是缓存本身，调用方不得就地修改。
+        """
+        if self._log.signature() != self._cache_signature:
+            self._set_cache(self._log.load())
+            self._cache_signature = self._log.signature()
+        return self._cache
+
+    def _set_cache(self, principles: List[Dict[str, Any]]) -> None:
+        """设置缓存并重建 id 索引"""
+        self._cache = principles
+        self._id_index = {p["id"]: i for i, p in enumerate(principles)}
+        self._invalidate_views()
+
+    def _invalidate_views(self) -> None:
+        """缓存内容变化后丢弃派生索引"""
+        self._dimension_index = None
+        self._active_sorted = None
+
+    def _get_dimension_index(self) -> Dict[str, List[int]]:
+        """获取维度 -> 下标列表索引（基于原始记录，不做模型校验）"""
+        if self._dimension_index is None:
+            index: Dict[str, List[int]] = {}
+            for i, p in enumerate(self._cache):
+                index.setdefault(p["dimension"], []).append(i)
+            self._dimension_index = index
+        return self._dimension_index
+
+    def _get_active_sorted(self) -> List[int]:
+        """获取活跃原则下标列表（按置信度降序，同置信度保持写入顺序）"""
+        if self._active_sorted is None:
+            cache = self._cache
+            self._active_sorted = sorted(
+                (i for i, p in enumerate(cache) if p.get("active", True)),
+                key=lambda i: cache[i]["confidence"],
+                reverse=True,
+            )
+        return self._active_sorted
+
+    def _get_existing(self, principle_ids: List[str]) -> List[Principle]:
+        """按 ID 获取原则，任一不存在时报错
+
+        重复的 ID 只返回一份，按首次出现的顺序排列。
+
+        Raises:
+            AsmeError: 原则不存在时
+        """
+        # 只检查一次缓存签名，之后直接按 id 索引取记录
+        cache = self._load_all()
+        records = []
+        for principle_id in dict.fromkeys(principle_ids):
+            idx = self._id_index.get(principle_id)
+            if idx is None:
+                raise AsmeError(
+                    ErrorCode.PRINCIPLE_NOT_FOUND,
+                    f"原则不存在: {principle_id}"
+                )
+            records.append(cache[idx])
+        return _PRINCIPLE_LIST_ADAPTER.validate_python(records)
+
+    def _record_evolution(self, events: List[EvolutionEvent]) -> None:
+        """批量记录演化事件
 
         Args:
-            principle_id: 原则 ID
-            previous_confidence: 之前的置信度
-            new_confidence: 新的置信度
-            trigger: 触发类型
-            reason: 变化原因
-            evidence_ids: 相关证据 ID 列表
+            events: 演化事件列表
         """
-        from .evolution import EvolutionTracker
-
-        tracker = EvolutionTracker()
-        tracker.record_event(
-            principle_id=principle_id,
-            previous_confidence=previous_confidence,
-            new_confidence=new_confidence,
-            trigger=trigger,
-            reason=reason,
-            evidence_ids=evidence_ids,
-        )
+        if self._tracker is None:
+            from .evolution import EvolutionTracker
+            self._tracker = EvolutionTracker()
+
+        self._tracker.record_events(events)
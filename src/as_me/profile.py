@@ -6,40 +6,119 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, Optional, Tuple, Type
 
 from .memory.models import ProfileSettings, Profile
+from .memory.store import MemoryStore
+from .principle.store import PrincipleStore
 from .storage import get_storage_path
-from .storage.json_store import read_json, write_json
+from .storage.json_store import read_json, write_json_bytes
 
 
 class ProfileManager:
     """档案管理器
 
     负责管理用户档案和统计信息。
+    在 with 块内的更新只修改内存中的档案，正常退出时合并为一次写入，
+    块内抛出异常时丢弃未写入的更新：
+
+        with ProfileManager() as manager:
+            manager.increment_memories()
+            manager.increment_principles()
     """
 
     PROFILE_FILE = "profile.json"
 
-    def __init__(self):
-        """初始化档案管理器"""
-        self._file_path = get_storage_path(self.PROFILE_FILE)
+    def __init__(self, storage_root: Path | None = None) -> None:
+        """初始化档案管理器
+
+        Args:
+            storage_root: 存储根目录，默认 ~/.as-me/
+        """
+        self._storage_root = storage_root
+        self._file_path = get_storage_path(self.PROFILE_FILE, storage_root)
+
+        # 已解析档案缓存，按文件签名 (mtime_ns, size) 失效
+        self._cached: Optional[Profile] = None
+        self._cached_signature: Optional[Tuple[int, int]] = None
+
+        # 统计信息缓存及其来源档案（档案缓存对象被替换即失效）
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_source: Optional[Profile] = None
+
+        # 批量模式下持有的档案及未写入标记
+        self._batch_depth = 0
+        self._profile: Optional[Profile] = None
+        self._dirty = False
+
+    def __enter__(self) -> ProfileManager:
+        self._batch_depth += 1
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            try:
+                if exc_type is None:
+                    self.flush()
+            finally:
+                self._profile = None
+                self._dirty = False
+
+    def flush(self) -> None:
+        """写入批量模式下累积的更新，无更新时不写入
+
+        写入失败时保留未写入标记，可以再次调用重试。
+        """
+        if self._dirty and self._profile is not None:
+            self.save(self._profile)
+            self._dirty = False
 
     def get(self) -> Profile:
         """获取用户档案
 
         如果档案不存在，创建默认档案。
+        批量模式下返回内存中的档案（包含尚未写入的更新）。
 
         Returns:
             用户档案
         """
+        if self._batch_depth and self._profile is not None:
+            return self._profile
+
+        profile = self._read()
+        if self._batch_depth:
+            self._profile = profile
+        return profile
+
+    def _read(self) -> Profile:
+        """读取档案副本，供调用方修改"""
+        return self._load().model_copy(deep=True)
+
+    def _load(self) -> Profile:
+        """加载档案，不存在时创建默认档案
+
+        文件未变化时复用已解析的档案。返回的是缓存本身，调用方不得修改。
+        """
+        signature = self._signature()
+        if self._cached is not None and signature == self._cached_signature:
+            return self._cached
+
         data = read_json(self._file_path)
-        if data:
-            return Profile.model_validate(data)
+        if not data:
+            # 创建默认档案
+            return self._write(Profile())
 
-        # 创建默认档案
-        profile = Profile()
-        self.save(profile)
+        profile = Profile.model_validate(data)
+        self._cached = profile
+        self._cached_signature = signature
         return profile
 
     def save(self, profile: Profile) -> Profile:
@@ -51,11 +130,35 @@ class ProfileManager:
         Returns:
             保存后的档案
         """
-        profile.updated_at = datetime.now()
-        data = profile.model_dump(mode="json")
-        write_json(self._file_path, data)
+        self._write(profile)
         return profile
 
+    def _write(self, profile: Profile) -> Profile:
+        """写入档案并刷新缓存，返回缓存中的副本"""
+        profile.updated_at = datetime.now()
+        self._cached_signature = None
+        # 直接写入 pydantic 序列化的 JSON，不经过中间 dict
+        write_json_bytes(self._file_path, profile.model_dump_json().encode("utf-8"))
+        cached = profile.model_copy(deep=True)
+        self._cached = cached
+        self._cached_signature = self._signature()
+        return cached
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        """获取档案文件签名 (mtime_ns, size)，文件不存在时为 None"""
+        try:
+            st = self._file_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _commit(self, profile: Profile) -> Profile:
+        """提交档案更新：批量模式下只标记待写入，否则立即保存"""
+        if self._batch_depth:
+            self._dirty = True
+            return profile
+        return self.save(profile)
+
     def update_settings(self, **kwargs) -> Profile:
         """更新档案设置
 
@@ -72,7 +175,7 @@ class ProfileManager:
             if hasattr(profile.settings, key):
                 setattr(profile.settings, key, value)
 
-        return self.save(profile)
+        return self._commit(profile)
 
     def increment_memories(self, count: int = 1) -> Profile:
         """增加记忆计数
@@ -85,7 +188,7 @@ class ProfileManager:
         """
         profile = self.get()
         profile.total_memories += count
-        return self.save(profile)
+        return self._commit(profile)
 
     def decrement_memories(self, count: int = 1) -> Profile:
         """减少记忆计数
@@ -98,7 +201,7 @@ class ProfileManager:
         """
         profile = self.get()
         profile.total_memories = max(0, profile.total_memories - count)
-        return self.save(profile)
+        return self._commit(profile)
 
     def increment_principles(self, count: int = 1) -> Profile:
         """增加原则计数
@@ -111,7 +214,7 @@ class ProfileManager:
         """
         profile = self.get()
         profile.total_principles += count
-        return self.save(profile)
+        return self._commit(profile)
 
     def decrement_principles(self, count: int = 1) -> Profile:
         """减少原则计数
@@ -124,7 +227,7 @@ class ProfileManager:
         """
         profile = self.get()
         profile.total_principles = max(0, profile.total_principles - count)
-        return self.save(profile)
+        return self._commit(profile)
 
     def update_last_analyzed(self, session_id: str) -> Profile:
         """更新最后分析的会话
@@ -137,7 +240,7 @@ class ProfileManager:
         """
         profile = self.get()
         profile.last_analyzed_session = session_id
-        return self.save(profile)
+        return self._commit(profile)
 
     def sync_counts(self) -> Profile:
         """同步记忆和原则计数
@@ -147,28 +250,36 @@ class ProfileManager:
         Returns:
             更新后的档案
         """
-        from .memory.store import MemoryStore
-        from .principle.store import PrincipleStore
-
         profile = self.get()
 
-        # 重新计算记忆数量
-        memory_store = MemoryStore()
-        profile.total_memories = len(memory_store.get_all())
+        # 重新计算记忆和原则数量，只统计条数，不构建对外的模型副本
+        profile.total_memories = MemoryStore(self._storage_root).count()
+        profile.total_principles = PrincipleStore(self._storage_root).count()
 
-        # 重新计算原则数量
-        principle_store = PrincipleStore()
-        profile.total_principles = len(principle_store.get_all())
+        return self._commit(profile)
 
-        return self.save(profile)
-
-    def get_stats(self) -> dict:
+    def get_stats(self) -> Dict[str, Any]:
         """获取统计信息
 
         Returns:
             统计信息字典
         """
-        profile = self.get()
+        # 批量模式下包含未写入的更新，不使用缓存
+        if self._batch_depth and self._profile is not None:
+            return self._build_stats(self._profile)
+
+        profile = self._load()
+        if self._stats is None or self._stats_source is not profile:
+            self._stats = self._build_stats(profile)
+            self._stats_source = profile
+
+        # 返回副本，调用方修改不影响缓存
+        stats = dict(self._stats)
+        stats["settings"] = dict(stats["settings"])
+        return stats
+
+    def _build_stats(self, profile: Profile) -> Dict[str, Any]:
+        """由档案构建统计信息字典"""
         return {
             "total_memories": profile.total_memories,
             "total_principles": profile.total_principles,
@@ -176,7 +287,6 @@ class ProfileManager:
             "updated_at": profile.updated_at.isoformat(),
             "last_analyzed_session": profile.last_analyzed_session,
             "settings": {
-                "extraction_enabled": profile.settings.extraction_enabled,
                 "injection_enabled": profile.settings.injection_enabled,
                 "max_injected_memories": profile.settings.max_injected_memories,
                 "confidence_threshold": profile.settings.confidence_threshold,
@@ -5,12 +5,17 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
+from typing import Set
 
 
 # 默认存储根目录
 DEFAULT_STORAGE_ROOT = Path.home() / ".as-me"
 
+# 本进程内已确认存在的目录，避免每次写入都 mkdir/stat
+_ensured_dirs: Set[Path] = set()
+
 
 def get_storage_path(subpath: str = "", root: Path | None = None) -> Path:
     """获取存储路径
@@ -22,7 +27,13 @@ def get_storage_path(subpath: str = "", root: Path | None = None) -> Path:
     Returns:
         完整的存储路径
     """
-    base = root or DEFAULT_STORAGE_ROOT
+    # 根目录在缓存之外解析，修改 DEFAULT_STORAGE_ROOT 后立即生效
+    return _join_storage_path(root or DEFAULT_STORAGE_ROOT, subpath)
+
+
+@lru_cache(maxsize=128)
+def _join_storage_path(base: Path, subpath: str) -> Path:
+    """拼接存储路径（结果缓存，Path 不可变可安全共享）"""
     if subpath:
         return base / subpath
     return base
@@ -59,6 +70,29 @@ def ensure_storage_dir(root: Path | None = None) -> Path:
     ]
 
     for subdir in subdirs:
-        (base / subdir).mkdir(parents=True, exist_ok=True)
+        _ensure_dir(base / subdir)
 
     return base
+
+
+def ensure_parent_dir(path: Path, refresh: bool = False) -> None:
+    """确保文件的父目录存在
+
+    同一进程内每个目录只创建一次；目录在进程运行期间被外部删除时，
+    调用方可在写入失败后用 refresh=True 重新创建。
+
+    Args:
+        path: 文件路径
+        refresh: 忽略已创建记录，重新创建目录
+    """
+    parent = path.parent
+    if refresh:
+        _ensured_dirs.discard(parent)
+    _ensure_dir(parent)
+
+
+def _ensure_dir(directory: Path) -> None:
+    """创建目录（含父目录）并记录，已记录时跳过"""
+    if directory not in _ensured_dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(directory)
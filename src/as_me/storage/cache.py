@@ -5,14 +5,16 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
-from typing import Dict, List, Set
+from itertools import islice
+from typing import Dict, Iterable, List, Set
 
 from ..memory.models import MemoryAtom, MemoryTier, MemoryType
 from ..principle.models import Principle, PrincipleDimension
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryCache:
     """热数据内存缓存"""
 
@@ -30,6 +32,10 @@ class MemoryCache:
     principle_by_confidence: List[str] = field(default_factory=list)  # 降序排列
     confirmed_principles: Set[str] = field(default_factory=set)
 
+    # 插入时的排序键（负置信度），对象被就地修改后仍能定位原位置
+    _memory_sort_keys: Dict[str, float] = field(default_factory=dict, repr=False)
+    _principle_sort_keys: Dict[str, float] = field(default_factory=dict, repr=False)
+
     # 脏标记（延迟写入）
     dirty_memories: Set[str] = field(default_factory=set)
     dirty_principles: Set[str] = field(default_factory=set)
@@ -56,7 +62,8 @@ class MemoryCache:
             self.memory_by_tag[tag].add(memory.id)
 
         # 更新置信度排序
-        self._update_confidence_order()
+        _sorted_discard(self.memory_by_confidence, self._memory_sort_keys, memory.id)
+        _sorted_insert(self.memory_by_confidence, self._memory_sort_keys, memory.id, memory.confidence)
 
     def remove_memory(self, memory_id: str) -> None:
         """从缓存移除记忆"""
@@ -73,8 +80,7 @@ class MemoryCache:
             if tag in self.memory_by_tag:
                 self.memory_by_tag[tag].discard(memory_id)
 
-        if memory_id in self.memory_by_confidence:
-            self.memory_by_confidence.remove(memory_id)
+        _sorted_discard(self.memory_by_confidence, self._memory_sort_keys, memory_id)
 
         self.dirty_memories.discard(memory_id)
 
@@ -93,7 +99,11 @@ class MemoryCache:
             self.confirmed_principles.add(principle.id)
 
         # 更新置信度排序
-        self._update_principle_confidence_order()
+        _sorted_discard(self.principle_by_confidence, self._principle_sort_keys, principle.id)
+        _sorted_insert(
+            self.principle_by_confidence, self._principle_sort_keys,
+            principle.id, principle.confidence,
+        )
 
     def remove_principle(self, principle_id: str) -> None:
         """从缓存移除原则"""
@@ -107,8 +117,7 @@ class MemoryCache:
 
         self.confirmed_principles.discard(principle_id)
 
-        if principle_id in self.principle_by_confidence:
-            self.principle_by_confidence.remove(principle_id)
+        _sorted_discard(self.principle_by_confidence, self._principle_sort_keys, principle_id)
 
         self.dirty_principles.discard(principle_id)
 
@@ -126,8 +135,13 @@ class MemoryCache:
         Returns:
             置信度最高的记忆列表
         """
+        # 列表按置信度降序，二分找到低于阈值的起点，只遍历其前的区间
+        end = bisect_right(
+            self.memory_by_confidence, -min_confidence,
+            key=self._memory_sort_keys.__getitem__,
+        )
         result = []
-        for memory_id in self.memory_by_confidence:
+        for memory_id in islice(self.memory_by_confidence, end):
             if len(result) >= limit:
                 break
             memory = self.memories.get(memory_id)
@@ -137,18 +151,20 @@ class MemoryCache:
 
     def get_memories_by_type(self, memory_type: MemoryType) -> List[MemoryAtom]:
         """按类型获取记忆"""
-        memory_ids = self.memory_by_type.get(memory_type, set())
-        return [self.memories[mid] for mid in memory_ids if mid in self.memories]
+        return self._resolve_memories(self.memory_by_type.get(memory_type, ()))
 
     def get_memories_by_tier(self, tier: MemoryTier) -> List[MemoryAtom]:
         """按层级获取记忆"""
-        memory_ids = self.memory_by_tier.get(tier, set())
-        return [self.memories[mid] for mid in memory_ids if mid in self.memories]
+        return self._resolve_memories(self.memory_by_tier.get(tier, ()))
 
     def get_memories_by_tag(self, tag: str) -> List[MemoryAtom]:
         """按标签获取记忆"""
-        memory_ids = self.memory_by_tag.get(tag, set())
-        return [self.memories[mid] for mid in memory_ids if mid in self.memories]
+        return self._resolve_memories(self.memory_by_tag.get(tag, ()))
+
+    def _resolve_memories(self, memory_ids: Iterable[str]) -> List[MemoryAtom]:
+        """将记忆 ID 解析为记忆对象，每个 ID 只查一次字典，跳过已移除的 ID"""
+        get = self.memories.get
+        return [memory for memory in map(get, memory_ids) if memory is not None]
 
     def get_active_principles(self) -> List[Principle]:
         """获取活跃原则（按置信度排序）"""
@@ -164,18 +180,44 @@ class MemoryCache:
         self.dirty_memories.clear()
         self.dirty_principles.clear()
 
-    def _update_confidence_order(self) -> None:
-        """更新记忆置信度排序"""
-        self.memory_by_confidence = sorted(
-            self.memories.keys(),
-            key=lambda mid: self.memories[mid].confidence,
-            reverse=True
-        )
 
-    def _update_principle_confidence_order(self) -> None:
-        """更新原则置信度排序"""
-        self.principle_by_confidence = sorted(
-            self.principles.keys(),
-            key=lambda pid: self.principles[pid].confidence,
-            reverse=True
-        )
+def _sorted_insert(
+    ordered: List[str],
+    sort_keys: Dict[str, float],
+    item_id: str,
+    confidence: float,
+) -> None:
+    """按置信度降序插入，同置信度保持插入顺序
+
+    Args:
+        ordered: 按置信度降序排列的 ID 列表
+        sort_keys: ID -> 排序键（负置信度）
+        item_id: 要插入的 ID
+        confidence: 置信度
+    """
+    sort_keys[item_id] = -confidence
+    insort(ordered, item_id, key=sort_keys.__getitem__)
+
+
+def _sorted_discard(
+    ordered: List[str],
+    sort_keys: Dict[str, float],
+    item_id: str,
+) -> None:
+    """二分定位并移除 ID，不存在时忽略
+
+    Args:
+        ordered: 按置信度降序排列的 ID 列表
+        sort_keys: ID -> 排序键（负置信度）
+        item_id: 要移除的 ID
+    """
+    sort_key = sort_keys.get(item_id)
+    if sort_key is None:
+        return
+
+    # 从同置信度区间的起点向后查找
+    i = bisect_left(ordered, sort_key, key=sort_keys.__getitem__)
+    while ordered[i] != item_id:
+        i += 1
+    del ordered[i]
+    del sort_keys[item_id]
@@ -5,21 +5,36 @@
 
 from __future__ import annotations
 
-import gzip
-import json
+import re
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List
 
-from .json_store import read_json, write_json
+from .json_store import append_gzip_member, dumps_json, iter_jsonl_gz
+from .record_log import RecordLog
+
+
+# datetime.isoformat() 输出的无时区时间（微秒为 0 时省略小数部分）
+_PLAIN_ISO = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{6})?", re.ASCII)
 
 
 class ColdStorageManager:
     """冷数据压缩管理器
 
     负责将旧数据归档到压缩文件。
+    归档为 gzip 压缩的 JSON Lines，每次归档追加一个新的 gzip 成员，
+    无需读取和重新压缩已有内容。
     """
 
+    # 归档很少读取，用最快的压缩级别换取写入速度（体积略大）
+    ARCHIVE_COMPRESSLEVEL = 1
+
+    # 归档文件后缀。沿用旧版名称以兼容已有归档，但内容是多个 gzip 成员拼接的
+    # JSON Lines（每行一条记录），不是单个 JSON 文档：gzip.open 读出的是全部
+    # 成员解压后的拼接，需要逐行解析（见 _read_gzip）。旧版整文件 JSON 数组
+    # 会作为其中一行保留。
+    ARCHIVE_SUFFIX = ".json.gz"
+
     def __init__(self, base_path: Path):
         self.base_path = base_path
         self.archive_path = base_path / "archive"
@@ -34,41 +49,51 @@ class ColdStorageManager:
             归档的证据数量
         """
         cutoff = datetime.now() - timedelta(days=cutoff_days)
-        evidence_file = self.base_path / "evidence" / "index.json"
+        evidence_log = RecordLog(
+            self.base_path / "evidence" / "index.jsonl",
+            legacy_path=self.base_path / "evidence" / "index.json",
+        )
 
-        all_evidence = read_json(evidence_file)
+        all_evidence = evidence_log.load()
         if not all_evidence:
             return 0
 
         # 分离新旧数据
-        recent = []
-        archive = []
+        cutoff_iso = cutoff.isoformat()
+        recent: List[Dict[str, Any]] = []
+        archive: List[Dict[str, Any]] = []
         for e in all_evidence:
             timestamp_str = e.get("timestamp", "")
-            try:
-                timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                if timestamp.replace(tzinfo=None) > cutoff:
-                    recent.append(e)
-                else:
-                    archive.append(e)
-            except (ValueError, TypeError):
-                # 无法解析时间戳，保留在 recent
-                recent.append(e)
+            if _is_plain_iso(timestamp_str):
+                # 固定格式的 ISO 时间按字典序即时间序，直接比较字符串
+                is_recent = timestamp_str > cutoff_iso
+            else:
+                try:
+                    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+                    is_recent = timestamp.replace(tzinfo=None) > cutoff
+                except (ValueError, TypeError, AttributeError):
+                    # 无法解析时间戳，保留在 recent
+                    is_recent = True
+            (recent if is_recent else archive).append(e)
 
         if not archive:
             return 0
 
         # 压缩归档
         year_month = cutoff.strftime("%Y-%m")
-        archive_file = self.archive_path / f"evidence-{year_month}.json.gz"
-        self._write_gzip(archive_file, archive)
+        archive_file = self.archive_path / f"evidence-{year_month}{self.ARCHIVE_SUFFIX}"
+        self._append_to_archive(archive_file, archive)
 
-        # 更新原文件
-        write_json(evidence_file, recent)
+        # 用保留的证据重写日志（同时完成压缩）
+        evidence_log.rewrite(recent)
 
         return len(archive)
 
-    def archive_old_memories(self, memories: List[Dict], cutoff_days: int = 90) -> tuple[List[Dict], int]:
+    def archive_old_memories(
+        self,
+        memories: List[Dict[str, Any]],
+        cutoff_days: int = 90,
+    ) -> tuple[List[Dict[str, Any]], int]:
         """归档旧记忆
 
         Args:
@@ -98,12 +123,12 @@ class ColdStorageManager:
 
         if archive:
             year_month = datetime.now().strftime("%Y-%m")
-            archive_file = self.archive_path / f"memories-{year_month}.json.gz"
+            archive_file = self.archive_path / f"memories-{year_month}{self.ARCHIVE_SUFFIX}"
             self._append_to_archive(archive_file, archive)
 
         return recent, len(archive)
 
-    def load_archived_evidence(self, year_month: str) -> List[Dict]:
+    def load_archived_evidence(self, year_month: str) -> List[Dict[str, Any]]:
         """按需加载归档证据
 
         Args:
@@ -112,10 +137,10 @@ class ColdStorageManager:
         Returns:
             证据列表
         """
-        archive_file = self.archive_path / f"evidence-{year_month}.json.gz"
+        archive_file = self.archive_path / f"evidence-{year_month}{self.ARCHIVE_SUFFIX}"
         return self._read_gzip(archive_file)
 
-    def load_archived_memories(self, year_month: str) -> List[Dict]:
+    def load_archived_memories(self, year_month: str) -> List[Dict[str, Any]]:
         """按需加载归档记忆
 
         Args:
@@ -124,7 +149,7 @@ class ColdStorageManager:
         Returns:
             记忆列表
         """
-        archive_file = self.archive_path / f"memories-{year_month}.json.gz"
+        archive_file = self.archive_path / f"memories-{year_month}{self.ARCHIVE_SUFFIX}"
         return self._read_gzip(archive_file)
 
     def list_archives(self, prefix: str = "") -> List[str]:
@@ -140,27 +165,39 @@ class ColdStorageManager:
             return []
 
         archives = []
-        for f in self.archive_path.glob("*.json.gz"):
+        for f in self.archive_path.glob(f"*{self.ARCHIVE_SUFFIX}"):
             if not prefix or f.name.startswith(prefix):
                 archives.append(f.name)
         return sorted(archives)
 
-    def _write_gzip(self, path: Path, data: Any) -> None:
-        """写入 gzip 压缩文件"""
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with gzip.open(path, 'wt', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False)
+    def _read_gzip(self, path: Path) -> List[Dict[str, Any]]:
+        """读取 gzip 压缩的归档文件
+
+        兼容旧版整文件 JSON 数组：数组所在行展开为多条记录。
+        """
+        records: List[Dict[str, Any]] = []
+        for record in iter_jsonl_gz(path):
+            if isinstance(record, list):
+                records.extend(record)
+            else:
+                records.append(record)
+        return records
+
+    def _append_to_archive(self, path: Path, new_data: List[Dict[str, Any]]) -> None:
+        """追加数据到归档文件
+
+        新数据压缩为独立的 gzip 成员追加到文件末尾（gzip 允许成员拼接），
+        耗时只与新数据量有关。追加中断时只丢失本次的成员。
+        """
+        # 以换行开头，保证与旧版末尾无换行的数组分属不同行
+        payload = b"\n" + b"".join(dumps_json(record) + b"\n" for record in new_data)
+        append_gzip_member(path, payload, compresslevel=self.ARCHIVE_COMPRESSLEVEL)
 
-    def _read_gzip(self, path: Path) -> List[Dict]:
-        """读取 gzip 压缩文件"""
-        if not path.exists():
-            return []
 
-        with gzip.open(path, 'rt', encoding='utf-8') as f:
-            return json.load(f)
+def _is_plain_iso(value: object) -> bool:
+    """是否为 YYYY-MM-DDTHH:MM:SS[.ffffff] 格式的本地时间字符串
 
-    def _append_to_archive(self, path: Path, new_data: List[Dict]) -> None:
-        """追加数据到归档文件"""
-        existing = self._read_gzip(path)
-        existing.extend(new_data)
-        self._write_gzip(path, existing)
+    此格式与 datetime.isoformat() 的输出按字典序比较即按时间比较；
+    带时区后缀或其他格式的时间戳需要解析后比较。
+    """
+    return isinstance(value, str) and _PLAIN_ISO.fullmatch(value) is not None
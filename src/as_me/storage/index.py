@@ -5,9 +5,11 @@
 
 from __future__ import annotations
 
+import copy
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Set, Type
 
 from .json_store import read_json, write_json
 from ..memory.models import MemoryType, MemoryTier
@@ -15,15 +17,50 @@ from ..memory.models import MemoryType, MemoryTier
 
 INDEX_FILE = "index.json"
 TOP_CONFIDENCE_LIMIT = 100  # 保存前 100 个高置信度记忆 ID
+FLUSH_INTERVAL = 50  # 批量模式下累计多少次计数更新后写入一次
 
 
 class IndexManager:
-    """轻量级索引管理器"""
+    """轻量级索引管理器
 
-    def __init__(self, base_path: Path):
+    计数更新默认立即写入文件。在 with 块内的更新只修改内存中的索引，
+    累计 FLUSH_INTERVAL 次或正常退出时写入，块内抛出异常时丢弃未写入的更新：
+
+        with IndexManager(base_path) as index_manager:
+            for memory_count, principle_count in updates:
+                index_manager.update_counts(memory_count, principle_count)
+    """
+
+    def __init__(self, base_path: Path) -> None:
         self.base_path = base_path
         self.index_path = base_path / INDEX_FILE
 
+        # 批量模式下尚未写入的内存索引及累计更新次数
+        self._batch_depth = 0
+        self._index: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._pending = 0
+
+    def __enter__(self) -> IndexManager:
+        self._batch_depth += 1
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            try:
+                if exc_type is None:
+                    self.flush()
+            finally:
+                self._index = None
+                self._dirty = False
+                self._pending = 0
+
     def build_index(
         self,
         memory_ids_by_type: Dict[MemoryType, Set[str]] | None = None,
@@ -31,7 +68,7 @@ class IndexManager:
         top_confidence_ids: List[str] | None = None,
         memory_count: int = 0,
         principle_count: int = 0,
-    ) -> Dict:
+    ) -> Dict[str, Any]:
         """构建索引结构
 
         Args:
@@ -65,22 +102,47 @@ class IndexManager:
             "top_confidence_ids": (top_confidence_ids or [])[:TOP_CONFIDENCE_LIMIT],
         }
 
-    def save_index(self, index: Dict) -> None:
-        """保存索引"""
+    def save_index(self, index: Dict[str, Any]) -> None:
+        """保存索引（立即写入，并丢弃未写入的计数更新）"""
         write_json(self.index_path, index)
-
-    def load_index(self) -> Optional[Dict]:
-        """加载索引"""
-        return read_json(self.index_path)
+        self._index = None
+        self._dirty = False
+        self._pending = 0
+
+    def load_index(self) -> Optional[Dict[str, Any]]:
+        """加载索引，有未写入的更新时返回内存中索引的副本"""
+        if self._dirty:
+            return copy.deepcopy(self._index)
+        return self._read_index()
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        """读取当前索引，有未写入的更新时返回内存中的索引本身（不复制）"""
+        if self._dirty:
+            return self._index
+        index: Optional[Dict[str, Any]] = read_json(self.index_path)
+        return index
+
+    def mark_dirty(self) -> None:
+        """标记内存索引有未写入的更新"""
+        self._dirty = True
+        self._pending += 1
+
+    def flush(self) -> None:
+        """写入未保存的更新，无更新时不写入"""
+        if self._dirty and self._index is not None:
+            self.save_index(self._index)
 
     def update_counts(self, memory_count: int, principle_count: int) -> None:
         """更新计数
 
+        批量模式下只修改内存中的索引，否则立即写入。
+
         Args:
             memory_count: 记忆总数
             principle_count: 原则总数
         """
-        index = self.load_index()
+        # 文件读出的索引是新对象，内存索引由本实例独占，可以直接修改
+        index = self._read_index()
         if index is None:
             index = self.build_index(
                 memory_count=memory_count,
@@ -91,14 +153,21 @@ class IndexManager:
             index["principle_count"] = principle_count
             index["updated_at"] = datetime.now().isoformat()
 
-        self.save_index(index)
+        if not self._batch_depth:
+            self.save_index(index)
+            return
+
+        self._index = index
+        self.mark_dirty()
+        if self._pending >= FLUSH_INTERVAL:
+            self.flush()
 
     def get_memory_count(self) -> int:
         """获取记忆总数"""
-        index = self.load_index()
+        index = self._read_index()
         return index.get("memory_count", 0) if index else 0
 
     def get_principle_count(self) -> int:
         """获取原则总数"""
-        index = self.load_index()
+        index = self._read_index()
         return index.get("principle_count", 0) if index else 0
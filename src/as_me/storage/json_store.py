@@ -1,12 +1,47 @@
 """JSON 文件读写辅助函数
 
-支持普通 JSON 和 gzip 压缩 JSON 两种格式。
+支持普通 JSON、gzip 压缩 JSON 和 JSON Lines（追加写）三种格式。
+整文件写入先写临时文件再原子替换，中途中断不会留下半截文件。
 """
 
 import gzip
 import json
+import mmap
+import os
+import zlib
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, List
+
+import orjson
+
+from .base import ensure_parent_dir
+
+
+# 非字符串键（如枚举、整数）按字符串输出，与标准库 json 的行为一致；
+# datetime 交给 default=str 处理，保持 str() 的格式（空格分隔日期和时间）
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# gzip 成员头（魔数 + deflate 压缩方法）
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+def dumps_json(data: Any, indent: int | None = None) -> bytes:
+    """将数据编码为 UTF-8 JSON 字节
+
+    无法直接序列化的对象（包括 datetime）按 str() 输出。
+
+    Args:
+        data: 要编码的数据
+        indent: 缩进空格数，默认 None（紧凑格式）
+
+    Returns:
+        UTF-8 编码的 JSON 字节
+    """
+    if indent and indent != 2:
+        # orjson 只支持 2 空格缩进，其他缩进交给标准库
+        return json.dumps(data, ensure_ascii=False, indent=indent, default=str).encode("utf-8")
+    options = (_DUMPS_OPTIONS | orjson.OPT_INDENT_2) if indent else _DUMPS_OPTIONS
+    return orjson.dumps(data, default=str, option=options)
 
 
 def read_json(path: Path, compressed: bool = False) -> Any:
@@ -25,7 +60,7 @@ def read_json(path: Path, compressed: bool = False) -> Any:
     if not path.exists():
         return None
 
-    return json.loads(path.read_text(encoding="utf-8"))
+    return orjson.loads(path.read_bytes())
 
 
 def write_json(path: Path, data: Any, indent: int | None = None, compressed: bool = False) -> None:
@@ -41,13 +76,20 @@ def write_json(path: Path, data: Any, indent: int | None = None, compressed: boo
         write_json_gz(path, data)
         return
 
-    # 确保父目录存在
-    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_bytes(path, dumps_json(data, indent))
 
-    path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=indent, default=str),
-        encoding="utf-8"
-    )
+
+def write_json_bytes(path: Path, payload: bytes) -> None:
+    """将已编码的 JSON 字节写入文件（原子替换）
+
+    供已有 JSON 序列化结果的调用方（如 pydantic 的 model_dump_json）使用，
+    整个文件一次写入临时文件后替换。
+
+    Args:
+        path: JSON 文件路径
+        payload: UTF-8 编码的 JSON 字节
+    """
+    _atomic_write_bytes(path, payload)
 
 
 def read_json_gz(path: Path) -> Any:
@@ -61,36 +103,202 @@ def read_json_gz(path: Path) -> Any:
     Returns:
         解析后的 JSON 数据，文件不存在时返回 None
     """
-    # 标准化路径：确保使用 .json.gz 后缀
+    # 一次解压后直接解析字节，不经过文本流逐块解码
+    raw = read_json_gz_bytes(path)
+    if raw is None:
+        return None
+    return orjson.loads(raw)
+
+
+def write_json_gz(path: Path, data: Any) -> None:
+    """写入 gzip 压缩的 JSON 文件
+
+    Args:
+        path: 文件路径（自动添加 .gz 后缀）
+        data: 要写入的数据
+    """
+    write_json_gz_bytes(path, dumps_json(data))
+
+
+def read_json_gz_bytes(path: Path) -> bytes | None:
+    """读取 gzip 压缩 JSON 文件的原始字节（解压后，不解析）
+
+    路径规则与 read_json_gz 一致，供调用方用自己的解码器解析。
+    压缩文件通过 mmap 映射后一次性解压，省去分块读取和拼接的中间拷贝。
+
+    Args:
+        path: 文件路径（可以是 .json 或 .json.gz）
+
+    Returns:
+        解压后的 JSON 字节，文件不存在时返回 None
+    """
     gz_path = _ensure_gz_suffix(path)
     json_path = Path(str(gz_path).replace('.json.gz', '.json'))
 
-    # 优先读取压缩文件
     if gz_path.exists():
-        with gzip.open(gz_path, 'rt', encoding='utf-8') as f:
-            return json.load(f)
+        with open(gz_path, 'rb') as f:
+            # 空文件无法映射
+            if not f.seek(0, 2):
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return gzip.decompress(buf)
 
-    # 回退到未压缩文件（兼容旧数据）
     if json_path.exists():
-        return json.loads(json_path.read_text(encoding="utf-8"))
+        return json_path.read_bytes()
 
     return None
 
 
-def write_json_gz(path: Path, data: Any) -> None:
-    """写入 gzip 压缩的 JSON 文件
+def write_json_gz_bytes(path: Path, payload: bytes) -> None:
+    """将已编码的 JSON 字节写入 gzip 压缩文件
 
     Args:
         path: 文件路径（自动添加 .gz 后缀）
-        data: 要写入的数据
+        payload: UTF-8 编码的 JSON 字节
     """
-    gz_path = _ensure_gz_suffix(path)
+    _atomic_write_bytes(_ensure_gz_suffix(path), gzip.compress(payload))
+
+
+def read_jsonl(path: Path) -> List[Any]:
+    """读取 JSON Lines 文件
+
+    无法解析的行（如写入中断留下的半行）会被跳过。
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        记录列表，文件不存在时返回空列表
+    """
+    return list(iter_jsonl(path))
 
-    # 确保父目录存在
-    gz_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with gzip.open(gz_path, 'wt', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, default=str)
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    """逐行流式读取 JSON Lines 文件
+
+    与 read_jsonl 相同，但不一次性构建记录列表，内存占用与文件大小无关。
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        每行解析后的记录，文件不存在时不产生任何记录
+    """
+    if not path.exists():
+        return
+
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+
+
+def append_jsonl(path: Path, records: Iterable[Any]) -> None:
+    """追加记录到 JSON Lines 文件
+
+    所有记录拼接后一次写入。
+
+    Args:
+        path: 文件路径
+        records: 要追加的记录
+    """
+    _append_bytes(path, b"".join(dumps_json(record) + b"\n" for record in records))
+
+
+def append_jsonl_encoded(path: Path, lines: Iterable[str]) -> None:
+    """追加已编码的 JSON 行到 JSON Lines 文件
+
+    供已有 JSON 序列化结果的调用方（如 pydantic 的 model_dump_json）使用，
+    避免先转成 dict 再编码一次。
+
+    Args:
+        path: 文件路径
+        lines: 每条记录的 JSON 文本（不含换行符）
+    """
+    _append_bytes(path, "".join(line + "\n" for line in lines).encode("utf-8"))
+
+
+def append_gzip_member(path: Path, payload: bytes, compresslevel: int = 9) -> None:
+    """将数据压缩为独立的 gzip 成员追加到文件末尾
+
+    gzip 允许成员拼接，耗时只与新数据量有关。追加不是原子的，
+    中断时最后一个成员可能不完整，iter_jsonl_gz 读取时会忽略它。
+
+    Args:
+        path: 文件路径
+        payload: 未压缩的内容
+        compresslevel: 压缩级别
+    """
+    _append_bytes(path, gzip.compress(payload, compresslevel=compresslevel))
+
+
+def write_jsonl(path: Path, records: Iterable[Any]) -> None:
+    """整体重写 JSON Lines 文件（原子替换）
+
+    Args:
+        path: 文件路径
+        records: 全部记录
+    """
+    _atomic_write_bytes(path, b"".join(dumps_json(record) + b"\n" for record in records))
+
+
+def write_jsonl_gz(path: Path, records: Iterable[Any]) -> None:
+    """写入 gzip 压缩的 JSON Lines 文件（原子替换）
+
+    Args:
+        path: 文件路径（按原样使用，不自动添加后缀）
+        records: 全部记录
+    """
+    payload = b"".join(dumps_json(record) + b"\n" for record in records)
+    _atomic_write_bytes(path, gzip.compress(payload))
+
+
+def iter_jsonl_gz(path: Path) -> Iterator[Any]:
+    """逐行读取 gzip 压缩的 JSON Lines 文件
+
+    文件可以由多个 gzip 成员拼接而成（见 append_gzip_member），逐个成员解压；
+    追加中断留下的不完整成员会被跳过，从下一个成员头继续读取，
+    其他成员不受影响。无法解析的行会被跳过。
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        每行解析后的记录，文件不存在时不产生任何记录
+    """
+    if not path.exists():
+        return
+
+    data = path.read_bytes()
+    view = memoryview(data)
+    start = 0
+    while start < len(data):
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        try:
+            member = decompressor.decompress(view[start:])
+            complete = decompressor.eof
+        except zlib.error:
+            complete = False
+        if not complete:
+            # 成员不完整或已损坏，跳到下一个成员头
+            start = data.find(_GZIP_MAGIC, start + 1)
+            if start == -1:
+                return
+            continue
+
+        for line in member.splitlines():
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+        start = len(data) - len(decompressor.unused_data)
 
 
 def migrate_to_compressed(path: Path) -> bool:
@@ -114,7 +322,7 @@ def migrate_to_compressed(path: Path) -> bool:
         return False
 
     # 读取原数据
-    data = json.loads(json_path.read_text(encoding="utf-8"))
+    data = orjson.loads(json_path.read_bytes())
 
     # 写入压缩文件
     write_json_gz(gz_path, data)
@@ -125,6 +333,56 @@ def migrate_to_compressed(path: Path) -> bool:
     return True
 
 
+def _append_bytes(path: Path, payload: bytes) -> None:
+    """以一次写入追加字节到文件末尾
+
+    Args:
+        path: 文件路径
+        payload: 要追加的内容，为空时不创建文件
+    """
+    if not payload:
+        return
+
+    # 确保父目录存在
+    ensure_parent_dir(path)
+
+    try:
+        f = open(path, "ab")
+    except FileNotFoundError:
+        # 目录在本进程记录后被删除
+        ensure_parent_dir(path, refresh=True)
+        f = open(path, "ab")
+    with f:
+        f.write(payload)
+
+
+def _atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """原子写入文件
+
+    先写入同目录下的临时文件，再用 os.replace 替换目标文件，
+    读取方只会看到旧内容或完整的新内容。
+
+    Args:
+        path: 目标文件路径
+        payload: 文件内容
+    """
+    # 确保父目录存在
+    ensure_parent_dir(path)
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        try:
+            tmp_path.write_bytes(payload)
+        except FileNotFoundError:
+            # 目录在本进程记录后被删除
+            ensure_parent_dir(path, refresh=True)
+            tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def _ensure_gz_suffix(path: Path) -> Path:
     """确保路径以 .json.gz 结尾"""
     path_str = str(path)
@@ -0,0 +1,160 @@
+"""JSON Lines 记录日志
+
+以追加写代替整文件重写的记录存储：
+- 新增/更新：追加一行完整记录，加载时同 id 的后写记录覆盖先写记录
+- 删除：追加墓碑记录 {"id": ..., "_deleted": true}
+- 压缩：失效行占比超过阈值时，用当前有效记录整体重写文件
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .json_store import (
+    append_jsonl,
+    append_jsonl_encoded,
+    iter_jsonl,
+    read_json_gz,
+    write_jsonl,
+)
+
+
+# 墓碑标记字段
+TOMBSTONE_KEY = "_deleted"
+
+
+class RecordLog:
+    """JSON Lines 记录日志
+
+    每条记录必须带 "id" 字段。加载结果保持记录首次写入的顺序，
+    更新不改变位置，删除后重新写入的记录排在末尾。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_path: Path | None = None,
+        compact_ratio: float = 0.3,
+    ):
+        """初始化记录日志
+
+        Args:
+            path: 日志文件路径（.jsonl）
+            legacy_path: 旧版整文件 JSON 路径（.json 或 .json.gz），首次加载时迁移
+            compact_ratio: 失效行占比超过此值时需要压缩
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.compact_ratio = compact_ratio
+
+        # 文件中的总行数（含被覆盖的旧版本和墓碑），用于判断是否需要压缩
+        self._line_count = 0
+
+    def load(self) -> List[Dict[str, Any]]:
+        """加载并折叠所有记录
+
+        Returns:
+            当前有效的记录列表
+        """
+        self._migrate_legacy()
+
+        records: Dict[str, Dict[str, Any]] = {}
+        line_count = 0
+        for record in iter_jsonl(self.path):
+            line_count += 1
+            if not isinstance(record, dict) or "id" not in record:
+                continue
+            if record.get(TOMBSTONE_KEY):
+                records.pop(record["id"], None)
+            else:
+                records[record["id"]] = record
+
+        self._line_count = line_count
+        return list(records.values())
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> None:
+        """追加新增或更新的记录
+
+        Args:
+            records: 完整记录
+        """
+        records = list(records)
+        append_jsonl(self.path, records)
+        self._line_count += len(records)
+
+    def append_encoded(self, lines: Iterable[str]) -> None:
+        """追加已编码为 JSON 文本的记录
+
+        Args:
+            lines: 每条记录的 JSON 文本（不含换行符）
+        """
+        lines = list(lines)
+        append_jsonl_encoded(self.path, lines)
+        self._line_count += len(lines)
+
+    def delete(self, record_ids: Iterable[str]) -> None:
+        """追加墓碑记录
+
+        Args:
+            record_ids: 要删除的记录 ID
+        """
+        self.append({"id": record_id, TOMBSTONE_KEY: True} for record_id in record_ids)
+
+    def rewrite(self, records: List[Dict[str, Any]]) -> None:
+        """用有效记录整体重写日志（压缩）
+
+        Args:
+            records: 当前有效的全部记录
+        """
+        write_jsonl(self.path, records)
+        self._line_count = len(records)
+
+    def compact_if_needed(self, records: List[Dict[str, Any]]) -> bool:
+        """失效行占比超过阈值时压缩
+
+        Args:
+            records: 当前有效的全部记录（通常是 load 结果经增删后的列表）
+
+        Returns:
+            是否执行了压缩
+        """
+        if not self.needs_compaction(len(records)):
+            return False
+        self.rewrite(records)
+        return True
+
+    def needs_compaction(self, live_count: int) -> bool:
+        """判断失效行占比是否超过阈值
+
+        Args:
+            live_count: 当前有效记录数
+
+        Returns:
+            是否需要压缩
+        """
+        dead = self._line_count - live_count
+        return dead > 0 and dead > self._line_count * self.compact_ratio
+
+    def signature(self) -> Tuple[int, int]:
+        """获取日志文件签名 (mtime_ns, size)，文件不存在时为 (0, 0)"""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return (0, 0)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _migrate_legacy(self) -> None:
+        """将旧版整文件 JSON 迁移为 JSON Lines，迁移后删除旧文件"""
+        if self.legacy_path is None or self.path.exists():
+            return
+
+        legacy = read_json_gz(self.legacy_path)
+        if legacy is None:
+            return
+
+        self.rewrite([record for record in legacy if isinstance(record, dict)])
+
+        json_path = Path(str(self.legacy_path).replace(".json.gz", ".json"))
+        for path in (json_path, json_path.with_name(json_path.name + ".gz")):
+            path.unlink(missing_ok=True)
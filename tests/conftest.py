@@ -54,7 +54,7 @@ def sample_memory_atom():
     """示例记忆原子数据"""
     return {
         "id": "mem-001",
-        "type": "tech_preference",
+        "type": "preference",
         "content": "偏好使用 TypeScript 而不是 JavaScript",
         "confidence": 0.8,
         "tier": "short_term",
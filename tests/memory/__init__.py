@@ -0,0 +1 @@
+"""记忆模块测试"""
@@ -0,0 +1,72 @@
+"""记忆触发增量日志测试"""
+
+import pytest
+
+from as_me.memory.models import MemoryAtom, MemoryTier, MemoryType
+from as_me.memory.store import MemoryStore
+from as_me.storage.json_store import write_json_gz_bytes
+
+
+@pytest.fixture(autouse=True)
+def keep_journal(monkeypatch):
+    """测试数据很小，提高合并阈值，避免每次触发都立即合并回主文件"""
+    monkeypatch.setattr(MemoryStore, "DELTA_COMPACT_RATIO", 1000)
+
+
+def _make_memory(content: str) -> MemoryAtom:
+    return MemoryAtom(
+        type=MemoryType.PREFERENCE,
+        content=content,
+        confidence=0.6,
+        source_session_id="session-001",
+    )
+
+
+def test_trigger_is_journaled_and_replayed(temp_storage_dir):
+    """触发只追加增量日志，新实例加载时回放"""
+    store = MemoryStore(temp_storage_dir)
+    memory = store.save(_make_memory("偏好使用 TypeScript"))
+    base_file = temp_storage_dir / "memories" / "short-term.json.gz"
+    base_bytes = base_file.read_bytes()
+
+    store.trigger(memory.id)
+    store.trigger(memory.id)
+
+    assert base_file.read_bytes() == base_bytes
+    assert store._delta_path(MemoryTier.SHORT_TERM).exists()
+    assert MemoryStore(temp_storage_dir).get_by_id(memory.id).trigger_count == 2
+
+
+def test_delta_replayed_after_external_base_rewrite(temp_storage_dir):
+    """主文件被外部重写后，增量按 ID 回放到新内容上"""
+    store = MemoryStore(temp_storage_dir)
+    kept = store.save(_make_memory("喜欢函数式编程"))
+    removed = store.save(_make_memory("习惯早上处理复杂任务"))
+    store.trigger(kept.id)
+    store.trigger(removed.id)
+
+    # 外部进程用旧版内容重写主文件：删除一条、修改另一条的内容
+    rewritten = kept.model_copy(update={"content": "偏好函数式编程风格"})
+    write_json_gz_bytes(
+        temp_storage_dir / "memories" / "short-term.json",
+        b"[" + rewritten.model_dump_json().encode() + b"]",
+    )
+
+    # 同一实例按文件签名发现变化，与新实例结果一致
+    for reader in (store, MemoryStore(temp_storage_dir)):
+        memories = reader.get_all()
+        assert [m.id for m in memories] == [kept.id]
+        assert memories[0].content == "偏好函数式编程风格"
+        assert memories[0].trigger_count == 1
+
+
+def test_compact_folds_journal_into_base(temp_storage_dir):
+    """合并后日志删除，主文件包含触发结果"""
+    store = MemoryStore(temp_storage_dir)
+    memory = store.save(_make_memory("偏好简洁的视觉风格"))
+    store.trigger(memory.id)
+
+    store.compact()
+
+    assert not store._delta_path(MemoryTier.SHORT_TERM).exists()
+    assert MemoryStore(temp_storage_dir).get_by_id(memory.id).trigger_count == 1
@@ -0,0 +1,51 @@
+"""冷数据归档测试"""
+
+import gzip
+import json
+
+from as_me.storage.cold_storage import ColdStorageManager
+
+
+def test_read_legacy_array_archive_with_appended_members(temp_storage_dir):
+    """旧版整文件 JSON 数组归档在追加新成员后仍可完整读取"""
+    manager = ColdStorageManager(temp_storage_dir)
+    archive = manager.archive_path / f"memories-2026-01{manager.ARCHIVE_SUFFIX}"
+    archive.parent.mkdir(parents=True)
+    archive.write_bytes(gzip.compress(json.dumps([{"id": "old-1"}, {"id": "old-2"}]).encode()))
+
+    assert [r["id"] for r in manager.load_archived_memories("2026-01")] == ["old-1", "old-2"]
+
+    manager._append_to_archive(archive, [{"id": "new"}])
+    assert [r["id"] for r in manager.load_archived_memories("2026-01")] == ["old-1", "old-2", "new"]
+
+
+def test_truncated_member_only_loses_its_batch(temp_storage_dir):
+    """追加中断留下的不完整成员不影响前后的成员"""
+    manager = ColdStorageManager(temp_storage_dir)
+    archive = manager.archive_path / f"evidence-2026-01{manager.ARCHIVE_SUFFIX}"
+    manager._append_to_archive(archive, [{"id": "a"}])
+
+    member = gzip.compress(b"".join(b'{"id": "lost"}\n' for _ in range(100)))
+    with open(archive, "ab") as f:
+        f.write(member[:len(member) // 2])
+    manager._append_to_archive(archive, [{"id": "b"}])
+
+    assert [r["id"] for r in manager.load_archived_evidence("2026-01")] == ["a", "b"]
+
+
+def test_archive_old_memories(temp_storage_dir):
+    """只归档过期且低置信度的记忆"""
+    manager = ColdStorageManager(temp_storage_dir)
+    memories = [
+        {"id": "stale", "last_triggered_at": "2020-01-01T00:00:00", "confidence": 0.1},
+        {"id": "confident", "last_triggered_at": "2020-01-01T00:00:00", "confidence": 0.9},
+        {"id": "fresh", "last_triggered_at": "2999-01-01T00:00:00", "confidence": 0.1},
+    ]
+
+    kept, archived = manager.archive_old_memories(memories)
+    assert archived == 1
+    assert [m["id"] for m in kept] == ["confident", "fresh"]
+
+    [name] = manager.list_archives("memories-")
+    year_month = name[len("memories-"):-len(manager.ARCHIVE_SUFFIX)]
+    assert [m["id"] for m in manager.load_archived_memories(year_month)] == ["stale"]
@@ -0,0 +1,94 @@
+"""旧版存储文件迁移测试
+
+按旧版格式写入文件，确认新版存储能读取并迁移：
+- principles/core.json.gz: gzip 压缩的原则数组
+- evidence/index.json: 未压缩的证据数组
+- evolution/history.json.gz: gzip 压缩的演化事件数组
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from as_me.principle.evidence_store import EvidenceStore
+from as_me.principle.evolution import EvolutionTracker
+from as_me.principle.models import (
+    EvolutionEvent,
+    EvolutionTrigger,
+    Evidence,
+    Principle,
+    PrincipleDimension,
+)
+from as_me.principle.store import PrincipleStore
+from as_me.storage import base
+from as_me.storage.json_store import write_json_gz
+
+
+@pytest.fixture
+def storage_root(temp_storage_dir, monkeypatch):
+    """将默认存储根目录指向临时目录（EvolutionTracker 使用默认根目录）"""
+    monkeypatch.setattr(base, "DEFAULT_STORAGE_ROOT", temp_storage_dir)
+    return temp_storage_dir
+
+
+def test_migrate_principles(storage_root):
+    """旧版 core.json.gz 迁移为 core.jsonl，迁移后可继续更新"""
+    principles = [
+        Principle(dimension=PrincipleDimension.VALUES, statement=f"原则 {i}",
+                  confidence=0.5, evidence_count=1)
+        for i in range(3)
+    ]
+    write_json_gz(storage_root / "principles" / "core.json",
+                  [p.model_dump(mode="json") for p in principles])
+
+    store = PrincipleStore(storage_root)
+    assert [p.id for p in store.get_all()] == [p.id for p in principles]
+    assert (storage_root / "principles" / "core.jsonl").exists()
+    assert not (storage_root / "principles" / "core.json.gz").exists()
+
+    store.delete(principles[1].id)
+    store.confirm(principles[0].id)
+
+    reloaded = PrincipleStore(storage_root)
+    assert [p.id for p in reloaded.get_all()] == [principles[0].id, principles[2].id]
+    assert reloaded.get_by_id(principles[0].id).confirmed_by_user
+
+
+def test_migrate_evidence(storage_root):
+    """旧版未压缩的 index.json 迁移为 index.jsonl，字段索引可用"""
+    evidences = [
+        Evidence(memory_id="m1", source_session_id="s1", quote="引用 1", weight=0.5),
+        Evidence(memory_id="m1", source_session_id="s2", quote="引用 2", weight=0.5),
+        Evidence(principle_id="p1", source_session_id="s1", quote="引用 3", weight=0.5),
+    ]
+    legacy = storage_root / "evidence" / "index.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps([e.model_dump(mode="json") for e in evidences]))
+
+    store = EvidenceStore(storage_root)
+    assert store.count() == 3
+    assert not legacy.exists()
+    assert {e.id for e in store.get_by_memory("m1")} == {evidences[0].id, evidences[1].id}
+
+    assert store.delete_by_memory("m1") == 2
+    assert [e.id for e in EvidenceStore(storage_root).get_by_session("s1")] == [evidences[2].id]
+
+
+def test_migrate_evolution_history(storage_root):
+    """旧版 history.json.gz 迁移为 history.jsonl，新事件追加在其后"""
+    events = [
+        EvolutionEvent(principle_id="p1", previous_confidence=0.5, new_confidence=0.6,
+                       trigger=EvolutionTrigger.NEW_EVIDENCE, reason="旧事件",
+                       timestamp=datetime(2026, 1, 1, 10, 0, 0))
+    ]
+    write_json_gz(storage_root / "evolution" / "history.json",
+                  [e.model_dump(mode="json") for e in events])
+
+    tracker = EvolutionTracker()
+    tracker.record_event("p1", 0.6, 0.8, EvolutionTrigger.USER_CONFIRMATION, "新事件")
+
+    assert not (storage_root / "evolution" / "history.json.gz").exists()
+    history = EvolutionTracker().get_history("p1")
+    assert [e.reason for e in history] == ["旧事件", "新事件"]
+    assert [e.reason for e in EvolutionTracker().get_timeline()] == ["新事件", "旧事件"]
@@ -0,0 +1,61 @@
+"""RecordLog 追加日志测试"""
+
+from as_me.storage.json_store import iter_jsonl, write_json_gz
+from as_me.storage.record_log import TOMBSTONE_KEY, RecordLog
+
+
+def test_append_update_delete_round_trip(temp_storage_dir):
+    """更新保持原位置，删除后重新写入的记录排在末尾"""
+    log = RecordLog(temp_storage_dir / "records.jsonl")
+    log.append([{"id": "a", "v": 1}, {"id": "b", "v": 1}, {"id": "c", "v": 1}])
+    log.append([{"id": "a", "v": 2}])
+    log.delete(["b"])
+
+    assert RecordLog(log.path).load() == [{"id": "a", "v": 2}, {"id": "c", "v": 1}]
+
+    log.append([{"id": "b", "v": 3}])
+    assert [r["id"] for r in RecordLog(log.path).load()] == ["a", "c", "b"]
+
+
+def test_compaction_drops_dead_lines(temp_storage_dir):
+    """失效行超过阈值时压缩，压缩前后加载结果一致"""
+    log = RecordLog(temp_storage_dir / "records.jsonl", compact_ratio=0.3)
+    log.append([{"id": "a", "v": 0}, {"id": "b", "v": 0}])
+    for v in range(1, 4):
+        log.append([{"id": "a", "v": v}])
+    log.delete(["b"])
+
+    records = log.load()
+    assert records == [{"id": "a", "v": 3}]
+    assert log.needs_compaction(len(records))
+    assert log.compact_if_needed(records)
+
+    lines = list(iter_jsonl(log.path))
+    assert lines == [{"id": "a", "v": 3}]
+    assert not any(line.get(TOMBSTONE_KEY) for line in lines)
+    assert not log.compact_if_needed(RecordLog(log.path).load())
+
+
+def test_truncated_last_line_is_skipped(temp_storage_dir):
+    """写入中断留下的半行不影响其余记录"""
+    log = RecordLog(temp_storage_dir / "records.jsonl")
+    log.append([{"id": "a", "v": 1}])
+    with open(log.path, "ab") as f:
+        f.write(b'{"id": "b", "v"')
+
+    assert RecordLog(log.path).load() == [{"id": "a", "v": 1}]
+
+
+def test_legacy_file_is_migrated_once(temp_storage_dir):
+    """旧版整文件 JSON 首次加载时迁移为 JSON Lines 并删除"""
+    legacy = temp_storage_dir / "records.json"
+    write_json_gz(legacy, [{"id": "a", "v": 1}, "not a record", {"id": "b", "v": 2}])
+
+    log = RecordLog(temp_storage_dir / "records.jsonl", legacy_path=legacy)
+    assert log.load() == [{"id": "a", "v": 1}, {"id": "b", "v": 2}]
+    assert log.path.exists()
+    assert not (temp_storage_dir / "records.json.gz").exists()
+
+    # 迁移后出现的旧文件不会覆盖日志
+    write_json_gz(legacy, [{"id": "stale"}])
+    assert [r["id"] for r in log.load()] == ["a", "b"]